@@ -0,0 +1,81 @@
+import os
+import random
+
+
+# Writes a synthetic Python package to root and returns the path of the package. Modules are spread over import_depth
+# nested subpackages and import modules from the next level down. Each module has functions_per_file functions and a
+# class nested class_depth levels deep, and every function or method makes fanout calls to other functions.
+def generate_package(
+    root,
+    files=100,
+    functions_per_file=10,
+    fanout=3,
+    import_depth=2,
+    class_depth=1,
+    package_name="synthetic",
+    seed=0,
+):
+    rng = random.Random(seed)
+    levels = max(1, import_depth)
+
+    # Assigns each module to a level so that level i can import from level i + 1
+    modules = []
+    for index in range(files):
+        level = index % levels
+        parts = [package_name] + ["level%d" % depth for depth in range(1, level + 1)]
+        modules.append((level, parts + ["module%d" % index]))
+
+    for level in range(levels):
+        directory = os.path.join(
+            root, package_name, *["level%d" % depth for depth in range(1, level + 1)]
+        )
+        os.makedirs(directory, exist_ok=True)
+        open(os.path.join(directory, "__init__.py"), "w").close()
+
+    for index, (level, parts) in enumerate(modules):
+        imported = [
+            other_parts
+            for other_level, other_parts in modules
+            if other_level == level + 1
+        ]
+        imported = rng.sample(imported, min(2, len(imported)))
+        lines = ["import " + ".".join(other_parts) for other_parts in imported]
+        lines.append("")
+
+        function_names = [
+            "function%d_%d" % (index, f) for f in range(functions_per_file)
+        ]
+
+        # Returns a statement calling a local function or a function of an imported module
+        def random_call():
+            if len(imported) != 0 and rng.random() < 0.3:
+                other_parts = rng.choice(imported)
+                other_index = int(other_parts[-1][len("module") :])
+                return "%s.function%d_%d()" % (
+                    ".".join(other_parts),
+                    other_index,
+                    rng.randrange(functions_per_file),
+                )
+            return rng.choice(function_names) + "()"
+
+        for name in function_names:
+            lines.append("")
+            lines.append("def %s():" % name)
+            for _ in range(fanout):
+                lines.append("    " + random_call())
+            lines.append("")
+
+        indent = ""
+        for depth in range(class_depth):
+            lines.append("%sclass Class%d_%d:" % (indent, index, depth))
+            indent += "    "
+            lines.append("%sdef method%d(self):" % (indent, depth))
+            for _ in range(fanout):
+                lines.append(indent + "    " + random_call())
+            lines.append("")
+
+        filename = os.path.join(root, *parts) + ".py"
+        with open(filename, "w") as source:
+            source.write("\n".join(lines) + "\n")
+
+    return os.path.join(root, package_name)
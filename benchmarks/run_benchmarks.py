@@ -0,0 +1,160 @@
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from benchmarks.generate import generate_package
+from spaghetti.draw import draw_graph
+from spaghetti.measurements import Measurements
+from spaghetti.profiler import Profiler
+from spaghetti.search import Search
+
+
+# Runs every phase of an analysis of the package one after the other and returns the seconds each took
+def time_phases(package, draw=False):
+    phases = {}
+
+    def timed(name, function):
+        start = time.perf_counter()
+        result = function()
+        phases[name] = time.perf_counter() - start
+        return result
+
+    # An empty search does nothing so each phase can be run and timed separately
+    search = Search([])
+    search.filenames = [package]
+
+    files = timed("crawl", lambda: list(search.find_files()))
+    # Imports are crawled while the symbols of each file are added, so their time is taken from the search's own
+    # phases and left out of symbol_extractor
+    profiler = Profiler()
+    search.hooks = [profiler]
+    timed("symbol_extractor", lambda: [search.create_nodes(file) for file in files])
+    search.hooks = []
+    phases["import_crawling"] = profiler.phase_seconds.get("import_crawling", 0.0)
+    phases["symbol_extractor"] -= phases["import_crawling"]
+    timed("edge_detector", search.create_edges)
+    timed("get_nx_graph", search.get_nx_graph)
+    csr = timed("get_csr_graph", search.get_csr_graph)
+
+    def measure():
+        measurements = Measurements(csr)
+        return (
+            measurements.mean_degree,
+            measurements.severity,
+            measurements.node_connectivity,
+        )
+
+    timed("measurements", measure)
+
+    def render():
+        out = io.StringIO()
+        for line in search.iter_graph_lines(indent="-40"):
+            out.write(line + "\n")
+        return out
+
+    timed("text_rendering", render)
+    if draw is True:
+        timed("draw_graph", lambda: draw_graph(search.get_nx_graph(), "benchmark"))
+
+    return phases, {
+        "files": len(files),
+        "nodes": len(search.graph),
+        "edges": sum(len(node.get_edges()) for node in search.graph),
+    }
+
+
+# Generates a package of the given size and returns the fastest time of each phase over several repeats
+def run_benchmark(size, repeat=3, draw=False):
+    with tempfile.TemporaryDirectory() as root:
+        package = generate_package(root, **size)
+        # Lets the import resolver find the generated modules
+        sys.path.insert(0, root)
+        old_cwd = os.getcwd()
+        # draw_graph saves images relative to the working directory
+        os.chdir(root)
+        try:
+            best = {}
+            for _ in range(repeat):
+                phases, counts = time_phases(package, draw=draw)
+                for name, seconds in phases.items():
+                    best[name] = min(seconds, best.get(name, seconds))
+        finally:
+            os.chdir(old_cwd)
+            sys.path.remove(root)
+    best["total"] = sum(best.values())
+    return {"size": size, "counts": counts, "seconds": best}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time each phase of spaghetti on generated packages"
+    )
+    parser.add_argument(
+        "--files",
+        type=int,
+        nargs="+",
+        default=[50, 200],
+        help="numbers of files to benchmark",
+    )
+    parser.add_argument("--functions", type=int, default=10, help="functions per file")
+    parser.add_argument("--fanout", type=int, default=3, help="calls per function")
+    parser.add_argument(
+        "--import-depth", type=int, default=2, help="levels of nested subpackages"
+    )
+    parser.add_argument(
+        "--class-depth", type=int, default=1, help="levels of nested classes per file"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size")
+    parser.add_argument(
+        "--draw", action="store_true", default=False, help="also time draw_graph"
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default="benchmark.json",
+        help="file the JSON results are written to",
+    )
+    args = parser.parse_args()
+
+    results = []
+    for files in args.files:
+        size = {
+            "files": files,
+            "functions_per_file": args.functions,
+            "fanout": args.fanout,
+            "import_depth": args.import_depth,
+            "class_depth": args.class_depth,
+        }
+        result = run_benchmark(size, repeat=args.repeat, draw=args.draw)
+        results.append(result)
+        print(
+            "%6d files: " % files
+            + ", ".join(
+                "%s %.3fs" % (name, seconds)
+                for name, seconds in result["seconds"].items()
+            )
+        )
+
+    with open(args.output, "w") as output:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": results,
+            },
+            output,
+            indent=2,
+        )
+
+
+if __name__ == "__main__":
+    main()
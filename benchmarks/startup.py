@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+# Libraries that should only be imported when an option needs them
+HEAVY_MODULES = ("matplotlib", "networkx", "numpy", "scipy")
+
+# Runs the command-line interface on the given arguments and reports the heavy libraries it imported on stderr
+CLI_SCRIPT = """
+import sys
+from spaghetti.command_line import main
+sys.argv = ["spaghetti"] + sys.argv[1:]
+main()
+print("imported:" + ",".join(m for m in %r if m in sys.modules), file=sys.stderr)
+""" % (HEAVY_MODULES,)
+
+
+# Returns the fastest wall clock time of running the command and the heavy libraries it reported importing
+def time_command(command, repeat, cwd):
+    best = None
+    imported = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            command, cwd=cwd, capture_output=True, text=True, check=True
+        )
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+        for line in result.stderr.splitlines():
+            if line.startswith("imported:"):
+                imported = [name for name in line[9:].split(",") if name != ""]
+    return best, imported
+
+
+# Times interpreter startup on its own, importing the command-line interface and runs of it with various options on a
+# small file
+def run_startup_benchmark(repeat=5):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "module.py")
+        with open(filename, "w") as source:
+            source.write("def a():\n    b()\n\n\ndef b():\n    pass\n")
+
+        commands = {
+            "python": [sys.executable, "-c", "pass"],
+            "import": [sys.executable, "-c", "import spaghetti.command_line"],
+            "text": [sys.executable, "-c", CLI_SCRIPT, filename],
+            "raw": [sys.executable, "-c", CLI_SCRIPT, "--raw", filename],
+            "measurements": [sys.executable, "-c", CLI_SCRIPT, "-m", filename],
+            "graphml": [sys.executable, "-c", CLI_SCRIPT, "-f", "graphml", filename],
+        }
+        results = {}
+        for name, command in commands.items():
+            seconds, imported = time_command(command, repeat, root)
+            results[name] = {"seconds": seconds, "heavy_modules": imported}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time how long spaghetti takes to start for small runs"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="runs per command")
+    parser.add_argument(
+        "--output",
+        "-o",
+        default="startup_benchmark.json",
+        help="file the JSON results are written to",
+    )
+    args = parser.parse_args()
+
+    results = run_startup_benchmark(repeat=args.repeat)
+    for name, result in results.items():
+        print(
+            "%-14s %.3fs  %s"
+            % (name, result["seconds"], ", ".join(result["heavy_modules"]))
+        )
+
+    with open(args.output, "w") as output:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": results,
+            },
+            output,
+            indent=2,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,9 @@ setup(
     long_description=readme(),
     classifiers=[
         "License :: OSI Approved :: MIT License",
-        "Programming Language :: Python :: 3.5" "Intended Audience :: Developers",
+        "Programming Language :: Python :: 3",
+        "Programming Language :: Python :: 3 :: Only",
+        "Intended Audience :: Developers",
         "Topic :: Software Development :: Debuggers",
     ],
     keywords="dependency graphs",
@@ -22,7 +24,8 @@ setup(
     author_email="nferrara100@gmail.com",
     license="MIT",
     packages=["spaghetti"],
-    install_requires=["networkx", "matplotlib"],
+    python_requires=">=3.8",
+    install_requires=["networkx", "matplotlib", "numpy"],
     entry_points={
         "console_scripts": [
             "spaghetti=spaghetti.command_line:main",
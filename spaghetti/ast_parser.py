@@ -1,12 +1,10 @@
 import ast
-import builtins
-import importlib
+import hashlib
+import mmap
 import os
 
-try:
-    from spaghetti.func_node import FuncNode
-except ImportError:
-    from func_node import FuncNode
+# Files at least this many bytes are memory-mapped instead of being copied into memory when they are read
+MMAP_THRESHOLD = 1 << 20
 
 
 # Parent class for basic AST parsing. Meant to be extended depending on the task
@@ -40,90 +38,11 @@ class ASTParser(ast.NodeVisitor):
         handler(node)
         self.__dict__[title] = old_title
 
-    # Adds the given node to the graph if it is not already in it
-    def add_node(self, node):
-        if node not in self.search.graph:
-            self.search.graph[node] = node
-
-
-# Searches AST for nodes and adds them to the graph
-class NodeCreator(ASTParser):
-    # Ensures that imported code is graphed as well
-    def visit_Import(self, node):
-        if self.recursive < 1:
-            for reference in node.names:
-                folders = self.directory.split(os.sep)
-                self.crawl_import(node, reference, folders)
-
-    # Utility function that recursively retries to crawl hard imports
-    def crawl_import(self, node, reference, folders, folder_index=0):
-        try:
-            folder = ""
-            x = len(folders) - folder_index
-            while x < len(folders) - 1:
-                if folders[x] != "":
-                    folder += folders[x] + "."
-                x += 1
-            imported_name = folder + reference.name
-            imported = importlib.import_module(imported_name)
-            visitor = NodeCreator(
-                search=self.search,
-                filename=imported.__file__,
-                recursive=self.recursive + 1,
-            )
-            tree_file = open(imported.__file__)
-            tree = ast.parse(tree_file.read())
-            visitor.visit(tree)
-            self.search.crawled_imports.add(imported_name)
-        except ImportError:
-            if folder_index < len(folders):
-                self.crawl_import(node, reference, folders, folder_index + 1)
-            else:
-                self.search.uncrawled.add(reference.name)
-        except AttributeError:
-            self.search.uncrawled.add(reference.name)
-
-    def visit_ClassDef(self, node):
-        self.handle_node(node, "current_class", self.add_class_node)
-
-    # Creates a node for the class even though it might not be connected to any other nodes
-    def add_class_node(self, node):
-        current_node = FuncNode(
-            filename=self.current_filename,
-            class_name=self.current_class,
-            name="__init__",
-            depth=self.recursive,
-            mode=self.search.mode,
-        )
-        self.add_node(current_node)
-        self.generic_visit(node)
-
-    def visit_FunctionDef(self, node):
-        self.handle_node(node, "current_function", self.add_function_node)
-
-    # Creates a node for the function even though it might not be connected to any other nodes
-    def add_function_node(self, node):
-        current_node = FuncNode(
-            filename=self.current_filename,
-            class_name=self.current_class,
-            name=self.current_function,
-            depth=self.recursive,
-            ast_node=node,
-            mode=self.search.mode,
-        )
-        self.add_node(current_node)
-        self.generic_visit(node)
-
-
-# Detects connections in the AST and adds them as edges in the graph
-class EdgeDetector(ASTParser):
-    # Records actual function calls
-    def visit_Call(self, node):
-        # print(ast.dump(node))
-
+    # Returns the name of the called function and the name it was called on, or None if it cannot be determined
+    def parse_call(self, node):
         # Checks for information to reconstruct the fully qualified name of the node. Not enough data is in the AST
         # to always be able to find the right node.
-        if "value" in dir(node.func):
+        if isinstance(node.func, ast.Attribute):
             dependency = node.func.attr
             try:
                 home = node.func.value.id
@@ -134,91 +53,178 @@ class EdgeDetector(ASTParser):
                 dependency = node.func.id
                 home = self.current_filename
             except AttributeError:
-                self.generic_visit(node)
-                return
-
-        dependency_node = None
-        already_found = False
-
-        # Searches the graph and selects the node being referenced
-        for n in self.search.graph:
-            if n.get_name() == dependency or (
-                n.get_name() == "__init__" and n.get_class() == dependency
-            ):
-                if already_found is True:
-                    # If there is a conflict and this is a more exact match save this
-                    if (
-                        n.is_identifier(home) is True
-                        and dependency_node.is_identifier(home) is False
-                    ):
-                        dependency_node = n
-                    # Do nothing if existing node is better.
-                    if (
-                        n.is_identifier(home) is False
-                        and dependency_node.is_identifier(home) is True
-                    ):
-                        pass
-                    # If neither or both match throw an error. This should not happen normally.
-                    else:
-                        self.search.unsure_nodes.add(
-                            self.current_filename
-                            + ":"
-                            + self.current_function
-                            + "("
-                            + dependency
-                            + ")"
-                        )
-                else:
-                    dependency_node = n
-                    already_found = True
+                return None
+        return dependency, home
 
-            if n.get_ast_node() == node:
-                this_node = n
 
-        # Creates this node if it was not already in the graph
-        try:
-            this_node
-        except NameError:
-            if self.current_function == "":
-                self.current_function = "__main__"
+# Finds the modules imported by a file and adds them to the graph. The imports themselves are found by SymbolExtractor.
+class NodeCreator(ASTParser):
+    # Utility function that recursively retries to crawl hard imports. Returns the name the module was found under.
+    def crawl_import(self, name, folder_index=0):
+        folders = self.directory.split(os.sep)
+        folder = ""
+        x = len(folders) - folder_index
+        while x < len(folders) - 1:
+            if folders[x] != "":
+                folder += folders[x] + "."
+            x += 1
+        imported_name = folder + name
+        found, filename = self.search.resolver.resolve(imported_name)
+        if found is False:
+            if folder_index < len(folders):
+                return self.crawl_import(name, folder_index + 1)
+            else:
+                self.search.uncrawled.add(name)
+        elif filename is None:
+            # Builtin and extension modules and namespace packages have no source to crawl
+            self.search.uncrawled.add(name)
+        else:
+            self.search.crawl_module(filename, self.recursive + 1)
+            self.search.crawled_imports.add(imported_name)
+            return imported_name
+        return None
+
+    # Crawls the module of a "from module import names" statement and any of the names that are submodules of it.
+    # Relative imports are looked for in the parent packages of this file instead of the import path.
+    def crawl_import_from(self, module, level, names):
+        if level == 0:
+            imported_name = self.crawl_import(module)
+            path = None
+        else:
+            directory = os.path.dirname(self.filename)
+            for _ in range(level - 1):
+                directory = os.path.dirname(directory)
+            path = [directory]
+            imported_name = None
+            if module != "":
+                found, filename = self.search.resolver.resolve(module, path)
+                if found is True and filename is not None:
+                    self.search.crawl_module(filename, self.recursive + 1)
+                    self.search.crawled_imports.add("." * level + module)
+                    imported_name = module
+                else:
+                    self.search.uncrawled.add("." * level + module)
+                    return
+
+        if level == 0 and imported_name is None:
+            return
+        for name in names:
+            submodule = name if imported_name is None else imported_name + "." + name
+            # Names that are not modules are attributes of the imported module
+            found, filename = self.search.resolver.resolve(submodule, path)
+            if filename is not None:
+                self.search.crawl_module(filename, self.recursive + 1)
+                self.search.crawled_imports.add("." * level + submodule)
+
+
+# The definitions, imports and calls found in a single file. Only holds plain data so that it can be sent between
+# processes, cached on disk and added to a graph later with Search.add_symbols().
+class FileSymbols:
+    def __init__(self, filename, digest=None, stat=None):
+        self.filename = filename
+        # Hash of the source and its (modification time, size) when it was read. Used to validate cached copies.
+        self.digest = digest
+        self.stat = stat
+        # ("def", class name, function name, first line, last line), ("import", module name) and ("import_from",
+        # module name, level, names) entries in the order they were found. The lines of a class are given with its
+        # __init__.
+        self.definitions = []
+        # (class name, function name, dependency, home) for every call in the order they were found
+        self.calls = []
+
+
+# Records the definitions, imports and calls of a file in a single pass without needing a graph
+class SymbolExtractor(ASTParser):
+    def __init__(self, filename=""):
+        super().__init__(search=None, filename=filename)
+        self.symbols = FileSymbols(filename)
 
-            this_node = FuncNode(
-                filename=self.current_filename,
-                class_name=self.current_class,
-                name=self.current_function,
-                ast_node=node,
-                mode=self.search.mode,
+    def visit_Import(self, node):
+        for reference in node.names:
+            self.symbols.definitions.append(("import", reference.name))
+
+    def visit_ImportFrom(self, node):
+        self.symbols.definitions.append(
+            (
+                "import_from",
+                node.module or "",
+                node.level,
+                tuple(reference.name for reference in node.names),
             )
+        )
 
-        self.add_edge(
-            dependency,
-            this_node,
-            dependency_node,
+    def visit_ClassDef(self, node):
+        self.handle_node(node, "current_class", self.add_class)
+
+    def add_class(self, node):
+        self.symbols.definitions.append(
+            ("def", self.current_class, "__init__", node.lineno, node.end_lineno)
         )
         self.generic_visit(node)
 
-    # Adds an edge to the graph
-    def add_edge(self, dependency, this_node, dependency_node=None):
-        # Error handling if the node's identity could not be determined
-        if dependency_node is None:
-            if dependency in dir(builtins):  # sys.builtin_module_names
-                class_name = "Builtins"
-                dependency_file = "System"
-            else:
-                class_name = "Unknown"
-                dependency_file = "Unknown"
-            dependency_node = FuncNode(
-                filename=dependency_file,
-                class_name=class_name,
-                name=dependency,
-                depth=1,
-                mode=self.search.mode,
+    def visit_FunctionDef(self, node):
+        self.handle_node(node, "current_function", self.add_function)
+
+    def add_function(self, node):
+        self.symbols.definitions.append(
+            (
+                "def",
+                self.current_class,
+                self.current_function,
+                node.lineno,
+                node.end_lineno,
+            )
+        )
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        call = self.parse_call(node)
+        if call is not None:
+            self.symbols.calls.append(
+                (self.current_class, self.current_function, call[0], call[1])
             )
+            if self.current_function == "":
+                self.current_function = "__main__"
+        self.generic_visit(node)
 
-        # Ensures that the relevant nodes are in the graph if they were not already
-        self.add_node(this_node)
-        self.add_node(dependency_node)
 
-        # This works even if the node was not added to the graph because the existing node's hash would be the same.
-        self.search.graph[this_node].add_edge(dependency_node, dependency=True)
-        self.search.graph[dependency_node].add_edge(this_node, dependency=False)
+# Returns the hash used to tell whether a file's contents changed
+def hash_source(source):
+    return hashlib.sha1(source).hexdigest()
+
+
+# Returns the contents of a file and its (modification time, size) when it was read. Large files are memory-mapped so
+# that parsing and hashing share a buffer the operating system can page in and out, and release_source() should be
+# called once they are no longer needed. Bytes are given to the parser so that it decodes them itself, respecting
+# encoding declarations.
+def read_source(filename):
+    with open(filename, "rb") as source_file:
+        stat = os.fstat(source_file.fileno())
+        if stat.st_size != 0 and stat.st_size >= MMAP_THRESHOLD:
+            source = mmap.mmap(source_file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            source = source_file.read()
+    return source, (stat.st_mtime_ns, stat.st_size)
+
+
+# Unmaps a memory-mapped result of read_source()
+def release_source(source):
+    if isinstance(source[0], mmap.mmap):
+        source[0].close()
+
+
+# Parses a file and returns its FileSymbols. Module level so that it can be run in a process pool. The result of
+# read_source() can be given if the file was already read.
+def extract_symbols(filename, source=None):
+    if source is None:
+        source = read_source(filename)
+    try:
+        tree = ast.parse(source[0])
+        digest = hash_source(source[0])
+    finally:
+        release_source(source)
+    extractor = SymbolExtractor(filename=filename)
+    extractor.visit(tree)
+    extractor.symbols.digest = digest
+    extractor.symbols.stat = source[1]
+    return extractor.symbols
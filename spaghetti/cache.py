@@ -0,0 +1,115 @@
+import os
+import pickle
+
+try:
+    from spaghetti.ast_parser import (
+        FileSymbols,
+        hash_source,
+        read_source,
+        release_source,
+    )
+except ImportError:
+    from ast_parser import FileSymbols, hash_source, read_source, release_source
+
+# Bump whenever the format of FileSymbols changes so that old entries are ignored
+CACHE_VERSION = 3
+DEFAULT_MAX_SIZE = 100 * 1024 * 1024
+
+
+# Stores the symbols extracted from each file between runs so that unchanged files do not need to be parsed again.
+# Entries are keyed by path and validated with the file's modification time and size, falling back to a hash of its
+# contents. The least recently used entries are removed once the cache grows past max_size bytes.
+class ParseCache:
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = os.path.join(
+            os.path.abspath(os.path.expanduser(directory)), "v%d" % CACHE_VERSION
+        )
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get_entry_path(self, filename):
+        return os.path.join(self.directory, hash_source(filename.encode()) + ".pickle")
+
+    # Returns the cached FileSymbols for the file or None if it changed or was never cached
+    def get(self, filename):
+        entry_path = self.get_entry_path(filename)
+        try:
+            with open(entry_path, "rb") as entry_file:
+                entry = pickle.load(entry_file)
+            stat = os.stat(filename)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        cached_filename, cached_stat, digest, definitions, calls = entry
+        current_stat = (stat.st_mtime_ns, stat.st_size)
+
+        if cached_filename != filename:
+            self.misses += 1
+            return None
+        if cached_stat != current_stat:
+            # The file was touched but its contents might still be the same
+            try:
+                source = read_source(filename)
+            except OSError:
+                self.misses += 1
+                return None
+            try:
+                changed = hash_source(source[0]) != digest
+            finally:
+                release_source(source)
+            if changed is True:
+                self.misses += 1
+                return None
+            cached_stat = current_stat
+
+        file_symbols = FileSymbols(filename, digest=digest, stat=cached_stat)
+        file_symbols.definitions = definitions
+        file_symbols.calls = calls
+        if cached_stat != entry[1]:
+            self.put(file_symbols)
+        else:
+            # Marks the entry as recently used
+            os.utime(entry_path)
+        self.hits += 1
+        return file_symbols
+
+    # Stores the given FileSymbols. Writes to a temporary file first so concurrent runs never see partial entries.
+    def put(self, file_symbols):
+        entry_path = self.get_entry_path(file_symbols.filename)
+        entry = (
+            file_symbols.filename,
+            file_symbols.stat,
+            file_symbols.digest,
+            file_symbols.definitions,
+            file_symbols.calls,
+        )
+        temp_path = "%s.%d.tmp" % (entry_path, os.getpid())
+        try:
+            with open(temp_path, "wb") as entry_file:
+                pickle.dump(entry, entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, entry_path)
+        except OSError:
+            # Caching is only an optimisation so failing to write is not an error
+            pass
+
+    # Removes the least recently used entries until the cache fits in max_size
+    def prune(self):
+        entries = []
+        total_size = 0
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total_size += stat.st_size
+        for mtime, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+                total_size -= size
+            except OSError:
+                pass
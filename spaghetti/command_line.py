@@ -1,23 +1,47 @@
 import argparse
 import os
+import sys
+import time
 
 try:
-    from spaghetti.draw import draw_graph
+    from spaghetti.cycles import Cycles
+    from spaghetti.draw import IMAGE_FORMATS, LAYOUTS, draw_graph
+    from spaghetti.export import BINARY_FORMATS, FORMATS, write_graph
+    from spaghetti.focus import DIRECTIONS, parse_focus
+    from spaghetti.impact import (
+        find_changed_nodes,
+        get_cache_directory,
+        get_changed_lines,
+    )
+    from spaghetti.levels import LEVELS
     from spaghetti.measurements import Measurements
+    from spaghetti.profiler import Profiler
     from spaghetti.search import Search
     from spaghetti.state import Mode
 except:
-    from draw import draw_graph
+    from cycles import Cycles
+    from draw import IMAGE_FORMATS, LAYOUTS, draw_graph
+    from export import BINARY_FORMATS, FORMATS, write_graph
+    from focus import DIRECTIONS, parse_focus
+    from impact import find_changed_nodes, get_cache_directory, get_changed_lines
+    from levels import LEVELS
     from measurements import Measurements
+    from profiler import Profiler
     from search import Search
     from state import Mode
 
+# Metrics that can be selected with --metrics
+METRICS = ("degree", "severity", "connectivity", "functions")
+
 
 # Gets input data supplied as command-line arguments
 def get_input(filename=None):
     # Configures the command-line interface.
     parser = argparse.ArgumentParser(
-        description="Graph function level Python 3 dependencies to understand and fix spaghetti code"
+        description="Graph function level Python 3 dependencies to understand and fix spaghetti code",
+        epilog="Use 'spaghetti query SNAPSHOT [options]' to answer questions from a graph saved with --format npz "
+        "--output SNAPSHOT instead of searching the code again. Use 'spaghetti impact --since REV [F ...]' to graph "
+        "the functions changed in git since REV and every function that depends on them.",
     )
     parser.add_argument(
         "filename",
@@ -47,6 +71,19 @@ def get_input(filename=None):
         default=False,
         help="prints useful measurements about the relationships between functions",
     )
+    parser.add_argument(
+        "--metrics",
+        default=None,
+        help="comma separated measurements to print, implies --measurements. Choose from "
+        + ", ".join(METRICS),
+    )
+    parser.add_argument(
+        "--cycles",
+        "-c",
+        action="store_true",
+        default=False,
+        help="prints the cycles of functions calling each other and the layers of the graph without them",
+    )
     parser.add_argument(
         "--draw",
         "-d",
@@ -55,6 +92,57 @@ def get_input(filename=None):
         help="save to result to a .png file in new subdirectory dependency_graphs"
         + os.sep,
     )
+    parser.add_argument(
+        "--layout",
+        choices=LAYOUTS,
+        default="auto",
+        help="how --draw lays out the graph. dot and sfdp need Graphviz and scale to much larger graphs than spring, "
+        "auto picks sfdp for large graphs if it is installed",
+    )
+    parser.add_argument(
+        "--image-format",
+        choices=IMAGE_FORMATS,
+        default="png",
+        help="file format of the image saved by --draw",
+    )
+    parser.add_argument(
+        "--cluster",
+        action="store_true",
+        default=False,
+        help="group functions by module in drawings and dot output",
+    )
+    parser.add_argument(
+        "--level",
+        choices=LEVELS,
+        default="function",
+        help="graph classes, modules or packages instead of functions. Calls between them are counted and measurements "
+        "and drawings use the smaller graph",
+    )
+    parser.add_argument(
+        "--focus",
+        metavar="FUNCTION",
+        default=None,
+        help="only graph the functions near this one, given as module:Class.function, Class.function or function",
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=1,
+        metavar="N",
+        help="how many calls away from the --focus function to graph",
+    )
+    parser.add_argument(
+        "--direction",
+        choices=DIRECTIONS,
+        default="both",
+        help="graph the functions calling the --focus function (in), the ones it calls (out) or both",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="REV",
+        default="HEAD",
+        help="git revision impact compares the working tree with, defaults to HEAD",
+    )
     parser.add_argument(
         "--long",
         "-l",
@@ -76,7 +164,132 @@ def get_input(filename=None):
         default=False,
         help="suppress non-critical errors",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="number of processes used to parse files, 0 uses every available core",
+    )
+    parser.add_argument(
+        "--read-threads",
+        type=int,
+        default=4,
+        metavar="N",
+        help="number of threads reading files ahead of the parser, 0 reads each file when it is parsed",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DIR",
+        default=None,
+        help="reuse parsed files from previous runs stored in this directory, impact defaults to one in the "
+        "repository's .git directory",
+    )
+    parser.add_argument(
+        "--import-depth",
+        type=int,
+        default=1,
+        metavar="N",
+        help="how many levels of imports to graph, 0 graphs none of them",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help="only search files matching this glob, can be repeated, defaults to *.py",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        help="skip files and directories matching this glob, can be repeated. "
+        "Version control directories and virtualenvs are always skipped",
+    )
+    parser.add_argument(
+        "--no-gitignore",
+        dest="gitignore",
+        action="store_false",
+        default=True,
+        help="also search files ignored by .gitignore files",
+    )
+    parser.add_argument(
+        "--watch",
+        "-w",
+        action="store_true",
+        default=False,
+        help="keep running and print the output again whenever a file changes",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        metavar="FILE",
+        default=None,
+        help="write the output to a file instead of the terminal",
+    )
+    parser.add_argument(
+        "--format",
+        "-f",
+        choices=FORMATS,
+        default="text",
+        help="output format. jsonl, graphml and dot list every function and call for other tools, npz is a compact "
+        "binary format that can be loaded again without parsing",
+    )
+    parser.add_argument(
+        "--profile",
+        "-p",
+        action="store_true",
+        default=False,
+        help="print the time spent in each phase of the search to stderr",
+    )
+    parser.add_argument(
+        "--profile-files",
+        type=int,
+        default=0,
+        metavar="N",
+        help="also print the N slowest files when profiling, implies --profile",
+    )
+    args = parser.parse_intermixed_args()
+
+    if args.profile_files > 0:
+        args.profile = True
+
+    if args.metrics is None:
+        args.metrics = METRICS
+    else:
+        args.metrics = [metric.strip() for metric in args.metrics.split(",")]
+        for metric in args.metrics:
+            if metric not in METRICS:
+                parser.error("unknown metric %s" % metric)
+        args.measurements = True
+
+    # The query command reads a saved graph instead of searching files
+    args.query = len(args.filename) != 0 and args.filename[0] == "query"
+    if args.query is True:
+        args.filename = args.filename[1:]
+        if len(args.filename) != 1:
+            parser.error("query needs exactly one snapshot saved with --format npz")
+        if args.watch is True:
+            parser.error("--watch cannot be used with query")
+    # The impact command graphs the functions changed since a git revision and their dependents
+    args.impact = len(args.filename) != 0 and args.filename[0] == "impact"
+    if args.impact is True:
+        args.filename = args.filename[1:] or ["."]
+        if args.watch is True:
+            parser.error("--watch cannot be used with impact")
+        if args.focus is not None:
+            parser.error("--focus cannot be used with impact")
+    if args.focus is not None:
+        try:
+            parse_focus(args.focus)
+        except ValueError as error:
+            parser.error("--focus: %s" % error)
+    if args.depth < 0:
+        parser.error("--depth cannot be negative")
+    if args.format in BINARY_FORMATS and args.level != "function":
+        parser.error(
+            "%s snapshots hold every function, use --level when querying them"
+            % args.format
+        )
 
     if len(args.filename) == 0 and filename is None:
         args.filename.append(input("Filename to examine: "))
@@ -93,38 +306,116 @@ def get_input(filename=None):
     return args
 
 
-# Prints detailed measurments about the Networkx graph
-def print_measurements(nxg):
+# Prints detailed measurments about the Networkx graph or CSRGraph. Only the selected metrics are computed. unit names
+# what the nodes of the graph are, such as function or module.
+def print_measurements(nxg, out=None, metrics=METRICS, unit="function"):
     measure = Measurements(nxg)
-    print(
-        "The average number of dependents and dependencies per function: {:.2f}".format(
-            measure.mean_degree
+    units = unit + "es" if unit.endswith("s") else unit + "s"
+    if measure.node_num == 0:
+        print("There are no {} to measure.".format(units), file=out)
+        return
+    if "degree" in metrics:
+        print(
+            "The average number of dependents and dependencies per {}: {:.2f}".format(
+                unit, measure.mean_degree
+            ),
+            file=out,
         )
-    )
-    print(
-        "The maximum number of dependents and dependencies per function: "
-        + repr(measure.max_degree)
-    )
-    if measure.node_connectivity == 0:
         print(
-            "There are isolated functions or groups of isolated functions. Severity: {:.2f}%".format(
-                measure.severity
+            "The maximum number of dependents and dependencies per {}: {!r}".format(
+                unit, measure.max_degree
+            ),
+            file=out,
+        )
+    if "connectivity" in metrics:
+        if measure.node_connectivity is None:
+            print(
+                "There are no isolated {2} or groups of isolated {2}. At most {1:d} {0}(s) would "
+                "need to be removed to isolate at least 1 {0}.".format(
+                    unit, measure.node_connectivity_bound, units
+                ),
+                file=out,
+            )
+        elif measure.node_connectivity == 0:
+            print(
+                "There are isolated {2} or groups of isolated {2}. Severity: {1:.2f}%".format(
+                    unit, measure.severity, units
+                ),
+                file=out,
             )
+        else:
+            print(
+                "There are no isolated {2} or groups of isolated {2}. At least {1:d} {0}(s) that "
+                "would need to be removed to isolate at least 1 {0}.".format(
+                    unit, measure.node_connectivity, units
+                ),
+                file=out,
+            )
+    elif "severity" in metrics:
+        if measure.severity > 0:
+            print(
+                "There are isolated {2} or groups of isolated {2}. Severity: {1:.2f}%".format(
+                    unit, measure.severity, units
+                ),
+                file=out,
+            )
+        else:
+            print(
+                "There are no isolated {0} or groups of isolated {0}.".format(units),
+                file=out,
+            )
+    if "functions" in metrics:
+        print(
+            "Total {} found in the search area: {!r}".format(units, measure.node_num),
+            file=out,
         )
+
+
+# Prints the cycles in the CSRGraph, largest first, and the layers of the graph left when each cycle is collapsed into
+# one node. Layer 1 holds the units that call nothing else and every other unit is one layer above the highest one it
+# calls.
+def print_cycles(csr, out=None, unit="function"):
+    cycles = Cycles(csr)
+    units = unit + "es" if unit.endswith("s") else unit + "s"
+
+    def get_names(node_ids):
+        return ", ".join(sorted(repr(csr.nodes[node_id]) for node_id in node_ids))
+
+    if len(cycles.cycles) == 0:
+        print("There are no cycles of {} calling each other.".format(units), file=out)
     else:
         print(
-            "There are no isolated functions or groups of isolated functions. At least {:d} function(s) that "
-            "would need to be removed to isolate at least 1 function.".format(
-                measure.node_connectivity
-            )
+            "Cycles of {} calling each other: {:d}".format(units, len(cycles.cycles)),
+            file=out,
         )
-    print("Total functions found in the search area: " + repr(measure.node_num))
+        for cycle in cycles.cycles:
+            print(
+                "{:d} {}: {}".format(
+                    len(cycle), unit if len(cycle) == 1 else units, get_names(cycle)
+                ),
+                file=out,
+            )
+
+    print(
+        "Layers of the graph with each cycle collapsed: {:d}".format(
+            len(cycles.layers)
+        ),
+        file=out,
+    )
+    for layer, component_ids in enumerate(cycles.layers):
+        node_ids = [
+            node_id
+            for component_id in component_ids
+            for node_id in cycles.components[component_id]
+        ]
+        print("Layer {:d}: {}".format(layer + 1, get_names(node_ids)), file=out)
 
 
-# Prints the results including a list of functions and their dependencies in the terminal
-def output_text(search, args):
+# Prints the results including a list of functions and their dependencies in the terminal or the given file
+def output_text(search, args, out=None):
     if args.raw is True:
-        print(search.get_graph_str(mode=args.mode))
+        for line in search.iter_graph_lines():
+            print(line, file=out)
     else:
         searched_str = " ".join(search.searched_files) + " ".join(
             search.searched_directories
@@ -132,21 +423,45 @@ def output_text(search, args):
         if searched_str != "":
             if len(search.crawled_imports) != 0:
                 imports_str = ", ".join(sorted(search.crawled_imports))
-                print("Also crawled these imports: %s" % imports_str)
+                print("Also crawled these imports: %s" % imports_str, file=out)
 
             if args.quiet is False:
                 if len(search.uncrawled) != 0:
                     uncrawled_str = ", ".join(sorted(search.uncrawled))
-                    print("Failed to crawl these imports: %s" % uncrawled_str)
+                    print("Failed to crawl these imports: %s" % uncrawled_str, file=out)
                 if len(search.unsure_nodes) != 0:
                     unsure_str = ", ".join(sorted(search.unsure_nodes))
                     if args.mode is not Mode.LONG:
                         unsure_str = unsure_str.replace(os.getcwd() + os.sep, "")
-                    print("Could not include the following functions: %s" % unsure_str)
+                    print(
+                        "Could not include the following functions: %s" % unsure_str,
+                        file=out,
+                    )
+
+            if args.impact is True:
+                changed_str = ", ".join(sorted(map(repr, args.changed_nodes)))
+                print(
+                    "Functions changed since %s: %s"
+                    % (args.since, changed_str or "none"),
+                    file=out,
+                )
+                print(
+                    "Functions affected by the changes: %d"
+                    % len(search.get_focused_nodes()),
+                    file=out,
+                )
 
             if args.measurements is True:
-                print()
-                print_measurements(search.get_nx_graph())
+                print(file=out)
+                csr = search.get_csr_graph()
+                with search.phase("measurements"):
+                    print_measurements(csr, out, args.metrics, unit=args.level)
+
+            if args.cycles is True:
+                print(file=out)
+                csr = search.get_csr_graph()
+                with search.phase("cycles"):
+                    print_cycles(csr, out, unit=args.level)
 
             if args.inverse is True:
                 dependents_string = "Dependencies"
@@ -154,18 +469,139 @@ def output_text(search, args):
                 dependents_string = "Dependents"
             indent = "-40"
             title_str = "\n%" + indent + "s %" + indent + "s\n"
-            print(title_str % ("Function Name", dependents_string))
-            print(search.get_graph_str(indent=indent))
+            name_string = args.level.capitalize() + " Name"
+            print(title_str % (name_string, dependents_string), file=out)
+            # Lines are written as they are produced so large graphs never need to be held in memory as one string
+            for line in search.iter_graph_lines(indent=indent):
+                print(line, file=out)
+            print(file=out)
+
+
+# Writes the output in the chosen format to the file given on the command-line, or else to the terminal
+def write_output(search, args):
+    with search.phase("output"):
+        if args.format == "text":
+            if args.output is None:
+                output_text(search, args)
+            else:
+                with open(args.output, "w") as out:
+                    output_text(search, args, out)
+        else:
+            title = " ".join(args.filename)
+            if args.output is None:
+                if args.format in BINARY_FORMATS:
+                    out = sys.stdout.buffer
+                else:
+                    out = sys.stdout
+                write_graph(search, args.format, out, title, args.cluster)
+                out.flush()
+            else:
+                mode = "wb" if args.format in BINARY_FORMATS else "w"
+                with open(args.output, mode) as out:
+                    write_graph(search, args.format, out, title, args.cluster)
+
+
+# Returns the modification time of every file in the search area
+def get_modification_times(search):
+    modification_times = {}
+    for file in search.list_files():
+        try:
+            modification_times[file] = os.stat(file).st_mtime_ns
+        except OSError:
+            pass
+    return modification_times
+
+
+# Polls the search area and prints the output again after updating the graph with the files that changed
+def watch(search, args, interval=1):
+    modification_times = get_modification_times(search)
+    try:
+        while True:
+            time.sleep(interval)
+            new_modification_times = get_modification_times(search)
+            changed_files = [
+                file
+                for file in set(modification_times) | set(new_modification_times)
+                if modification_times.get(file) != new_modification_times.get(file)
+            ]
+            modification_times = new_modification_times
+            if len(changed_files) != 0:
+                search.update(changed_files)
+                print()
+                write_output(search, args)
+    except KeyboardInterrupt:
+        pass
 
 
 # Entry point for command-line interface
 def main(filename=None):
     args = get_input(filename)
-    search = Search(filenames=args.filename, inverse=args.inverse, mode=args.mode)
-    output_text(search, args)
+    hooks = []
+    if args.profile is True:
+        profiler = Profiler(slowest_files=args.profile_files)
+        hooks.append(profiler)
+    if args.query is True:
+        search = Search.load(
+            args.filename[0],
+            inverse=args.inverse,
+            mode=args.mode,
+            hooks=hooks,
+            level=args.level,
+        )
+    else:
+        if args.impact is True and args.cache is None:
+            # Only the files that changed since the last impact run are parsed again
+            try:
+                args.cache = get_cache_directory(args.filename[0])
+            except ValueError as error:
+                print("Error: %s" % error, file=sys.stderr)
+                sys.exit(1)
+        search = Search(
+            filenames=args.filename,
+            inverse=args.inverse,
+            mode=args.mode,
+            jobs=args.jobs,
+            cache_dir=args.cache,
+            hooks=hooks,
+            import_depth=args.import_depth,
+            include=args.include,
+            exclude=args.exclude,
+            gitignore=args.gitignore,
+            read_threads=args.read_threads,
+            level=args.level,
+        )
+    if args.focus is not None:
+        if len(search.set_focus(args.focus, args.depth, args.direction)) == 0:
+            print("Error: no function matches %s" % args.focus, file=sys.stderr)
+            sys.exit(1)
+    if args.impact is True:
+        try:
+            with search.phase("git"):
+                changed_lines = get_changed_lines(args.since, *args.filename)
+        except ValueError as error:
+            print("Error: %s" % error, file=sys.stderr)
+            sys.exit(1)
+        args.changed_nodes = find_changed_nodes(search, changed_lines)
+        search.focus_on(args.changed_nodes, depth=None, direction="in")
+    write_output(search, args)
     if args.draw is True:
         title = " ".join(args.filename)
-        draw_graph(search.get_nx_graph(), title, args.mode)
+        nxg = search.get_nx_graph()
+        with search.phase("draw"):
+            draw_graph(
+                nxg,
+                title,
+                args.mode,
+                layout=args.layout,
+                image_format=args.image_format,
+                cluster=args.cluster,
+            )
+    if args.profile is True:
+        print(file=sys.stderr)
+        for line in profiler.iter_report_lines(search):
+            print(line, file=sys.stderr)
+    if args.watch is True:
+        watch(search, args)
 
 
 # In case the file is executed directly
@@ -0,0 +1,174 @@
+from array import array
+from itertools import accumulate
+
+
+# Integer-ID snapshot of a Search graph. Nodes are numbered in sorted order of FuncNode.get_string() and the edges of
+# each direction are stored as compressed sparse rows: the ids of node i's neighbours are ids[offsets[i]:offsets[i + 1]]
+# in ascending order. Uses far less memory than per-node sets and can be viewed as NumPy arrays without copying.
+class CSRGraph:
+    def __init__(self, nodes):
+        self.nodes = sorted(nodes, key=lambda the_node: the_node.get_string())
+        self.ids = {node: i for i, node in enumerate(self.nodes)}
+        # Number of calls each edge stands for, in the same order as the ids. None if every edge is a single call.
+        self.dependency_weights = None
+        self.dependent_weights = None
+
+        # Rows of the nodes each node calls and of the nodes calling each node
+        self.dependency_offsets, self.dependency_ids = self.build_rows(dependency=True)
+        self.dependent_offsets, self.dependent_ids = self.build_rows(dependency=False)
+
+    # Creates a CSRGraph from nodes that are already sorted and the rows of the nodes each of them calls, such as the
+    # ones saved by export.write_npz(), without sorting the nodes or their edges again. dependency_weights optionally
+    # gives the weight of each of those edges.
+    @classmethod
+    def from_rows(
+        cls, nodes, dependency_offsets, dependency_ids, dependency_weights=None
+    ):
+        graph = cls.__new__(cls)
+        graph.nodes = list(nodes)
+        graph.ids = {node: i for i, node in enumerate(graph.nodes)}
+        graph.dependency_offsets = array("q", dependency_offsets)
+        graph.dependency_ids = array("q", dependency_ids)
+        graph.dependency_weights = None
+        graph.dependent_weights = None
+        if dependency_weights is not None:
+            graph.dependency_weights = array("q", dependency_weights)
+            graph.dependent_weights = array("q", bytes(8 * len(graph.dependency_ids)))
+
+        # Counting sort of the calls by callee. Each row stays sorted because callers are visited in ascending order.
+        counts = [0] * (len(graph.nodes) + 1)
+        for edge_id in graph.dependency_ids:
+            counts[edge_id + 1] += 1
+        graph.dependent_offsets = array("q", accumulate(counts))
+        graph.dependent_ids = array("q", bytes(8 * len(graph.dependency_ids)))
+        positions = list(graph.dependent_offsets)
+        for node_id in range(len(graph.nodes)):
+            start = graph.dependency_offsets[node_id]
+            for i, edge_id in enumerate(graph.get_edges(node_id, dependency=True)):
+                graph.dependent_ids[positions[edge_id]] = node_id
+                if dependency_weights is not None:
+                    graph.dependent_weights[positions[edge_id]] = (
+                        graph.dependency_weights[start + i]
+                    )
+                positions[edge_id] += 1
+        return graph
+
+    # Creates the offset and id arrays for one direction, leaving out edges to nodes that are not in the graph
+    def build_rows(self, dependency):
+        offsets = array("q", [0])
+        ids = array("q")
+        for node in self.nodes:
+            row = sorted(
+                self.ids[edge]
+                for edge in node.get_edges(dependency=dependency)
+                if edge in self.ids
+            )
+            ids.extend(row)
+            offsets.append(len(ids))
+        return offsets, ids
+
+    def number_of_nodes(self):
+        return len(self.nodes)
+
+    def number_of_edges(self):
+        return len(self.dependency_ids)
+
+    def get_id(self, node):
+        return self.ids[node]
+
+    def get_node(self, node_id):
+        return self.nodes[node_id]
+
+    # Returns the ids of the nodes the given node calls, or of the nodes calling it
+    def get_edges(self, node_id, dependency=False):
+        if dependency is True:
+            return self.dependency_ids[
+                self.dependency_offsets[node_id] : self.dependency_offsets[node_id + 1]
+            ]
+        else:
+            return self.dependent_ids[
+                self.dependent_offsets[node_id] : self.dependent_offsets[node_id + 1]
+            ]
+
+    # Returns the weights of the edges returned by get_edges(), or None if the graph is not weighted
+    def get_edge_weights(self, node_id, dependency=False):
+        if dependency is True:
+            if self.dependency_weights is None:
+                return None
+            return self.dependency_weights[
+                self.dependency_offsets[node_id] : self.dependency_offsets[node_id + 1]
+            ]
+        else:
+            if self.dependent_weights is None:
+                return None
+            return self.dependent_weights[
+                self.dependent_offsets[node_id] : self.dependent_offsets[node_id + 1]
+            ]
+
+    def get_indegree(self, node_id):
+        return self.dependent_offsets[node_id + 1] - self.dependent_offsets[node_id]
+
+    def get_outdegree(self, node_id):
+        return self.dependency_offsets[node_id + 1] - self.dependency_offsets[node_id]
+
+    # Returns NumPy views of the offset and id arrays of one direction
+    def get_numpy_rows(self, dependency=False):
+        import numpy
+
+        if dependency is True:
+            offsets, ids = self.dependency_offsets, self.dependency_ids
+        else:
+            offsets, ids = self.dependent_offsets, self.dependent_ids
+        return (
+            numpy.frombuffer(offsets, dtype=numpy.int64),
+            numpy.frombuffer(ids, dtype=numpy.int64),
+        )
+
+    # Returns a NumPy array with the number of dependents and dependencies of every node
+    def get_degrees(self):
+        import numpy
+
+        dependency_offsets = self.get_numpy_rows(dependency=True)[0]
+        dependent_offsets = self.get_numpy_rows(dependency=False)[0]
+        return numpy.diff(dependency_offsets) + numpy.diff(dependent_offsets)
+
+    # Returns the number of nodes in each weakly connected component
+    def get_component_sizes(self):
+        component_sizes = []
+        visited = bytearray(len(self.nodes))
+        for start in range(len(self.nodes)):
+            if visited[start]:
+                continue
+            visited[start] = 1
+            stack = [start]
+            size = 0
+            while len(stack) != 0:
+                node_id = stack.pop()
+                size += 1
+                for edge_id in self.get_edges(node_id, dependency=True):
+                    if not visited[edge_id]:
+                        visited[edge_id] = 1
+                        stack.append(edge_id)
+                for edge_id in self.get_edges(node_id):
+                    if not visited[edge_id]:
+                        visited[edge_id] = 1
+                        stack.append(edge_id)
+            component_sizes.append(size)
+        return component_sizes
+
+    # Returns an equivalent networkx graph with edges pointing from each function to the functions calling it, or the
+    # other way around if inverse is true. Weighted edges keep their weight as the weight attribute.
+    def to_networkx(self, inverse=False):
+        import networkx
+
+        nxg = networkx.DiGraph()
+        nxg.add_nodes_from(self.nodes)
+        for node_id, node in enumerate(self.nodes):
+            weights = self.get_edge_weights(node_id)
+            for i, edge_id in enumerate(self.get_edges(node_id)):
+                attributes = {} if weights is None else {"weight": weights[i]}
+                if inverse is False:
+                    nxg.add_edge(node, self.nodes[edge_id], **attributes)
+                else:
+                    nxg.add_edge(self.nodes[edge_id], node, **attributes)
+        return nxg
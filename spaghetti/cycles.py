@@ -0,0 +1,120 @@
+import functools
+
+
+# Finds the cycles of functions calling each other in a CSRGraph and layers the graph left once each cycle is collapsed
+# into one node. Everything is computed on first use and cached like Measurements.
+class Cycles:
+    def __init__(self, csr):
+        self.csr = csr
+
+    # The strongly connected components of the graph as lists of node ids. Found with Tarjan's algorithm, which lists
+    # every component after all the components its functions call. Runs with an explicit stack so that long call
+    # chains do not reach the recursion limit.
+    @functools.cached_property
+    def components(self):
+        offsets = self.csr.dependency_offsets
+        ids = self.csr.dependency_ids
+        node_num = self.csr.number_of_nodes()
+        index = [-1] * node_num
+        low = [0] * node_num
+        on_stack = bytearray(node_num)
+        stack = []
+        components = []
+        counter = 0
+        for root in range(node_num):
+            if index[root] != -1:
+                continue
+            # Nodes being visited with the position in the ids of the next call to follow
+            work = [(root, offsets[root])]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            while len(work) != 0:
+                node, position = work[-1]
+                end = offsets[node + 1]
+                while position < end:
+                    edge = ids[position]
+                    position += 1
+                    if index[edge] == -1:
+                        break
+                    elif on_stack[edge] and index[edge] < low[node]:
+                        low[node] = index[edge]
+                else:
+                    edge = None
+                if edge is not None:
+                    # Visits the callee before continuing with the rest of the node's calls
+                    work[-1] = (node, position)
+                    work.append((edge, offsets[edge]))
+                    index[edge] = low[edge] = counter
+                    counter += 1
+                    stack.append(edge)
+                    on_stack[edge] = 1
+                    continue
+
+                work.pop()
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+                if len(work) != 0:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+        return components
+
+    # Maps every node id to the index of its component
+    @functools.cached_property
+    def component_ids(self):
+        component_ids = [0] * self.csr.number_of_nodes()
+        for component_id, component in enumerate(self.components):
+            for node_id in component:
+                component_ids[node_id] = component_id
+        return component_ids
+
+    # The components that are cycles, either several functions calling each other or one function calling itself,
+    # largest first
+    @functools.cached_property
+    def cycles(self):
+        cycles = [
+            component
+            for component in self.components
+            if len(component) > 1
+            or component[0] in self.csr.get_edges(component[0], dependency=True)
+        ]
+        return sorted(cycles, key=len, reverse=True)
+
+    # The graph with each component collapsed into one node, as the set of components each component calls. It has no
+    # cycles.
+    @functools.cached_property
+    def condensed(self):
+        condensed = [set() for _ in self.components]
+        component_ids = self.component_ids
+        for node_id in range(self.csr.number_of_nodes()):
+            component_id = component_ids[node_id]
+            for edge_id in self.csr.get_edges(node_id, dependency=True):
+                if component_ids[edge_id] != component_id:
+                    condensed[component_id].add(component_ids[edge_id])
+        return condensed
+
+    # The layer of every component in the condensed graph. Components that call nothing are in layer 0 and every other
+    # component is one layer above the highest component it calls. Tarjan's order already puts callees first.
+    @functools.cached_property
+    def component_layers(self):
+        layers = []
+        for calls in self.condensed:
+            layers.append(max((layers[edge] + 1 for edge in calls), default=0))
+        return layers
+
+    # Lists of components in each layer, from the bottom layer up
+    @functools.cached_property
+    def layers(self):
+        layers = [[] for _ in range(max(self.component_layers, default=-1) + 1)]
+        for component_id, layer in enumerate(self.component_layers):
+            layers[layer].append(component_id)
+        return layers
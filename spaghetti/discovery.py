@@ -0,0 +1,175 @@
+import fnmatch
+import os
+import re
+
+# Files searched when no include globs are given
+DEFAULT_INCLUDES = ("*.py",)
+# Directories that never hold code worth graphing. They are skipped before anything inside them is listed.
+DEFAULT_EXCLUDES = (
+    ".git",
+    ".hg",
+    ".svn",
+    "__pycache__",
+    "node_modules",
+    ".tox",
+    ".venv",
+    "venv",
+)
+# File at the top of every virtualenv, which marks directories with other names as ones to skip too
+VIRTUALENV_MARKER = "pyvenv.cfg"
+
+
+# Converts one line of a .gitignore file to (regular expression, negated, directory only), or None for blank lines
+# and comments
+def parse_gitignore_line(line):
+    line = line.rstrip("\n").rstrip()
+    if line == "" or line[0] == "#":
+        return None
+    negated = line[0] == "!"
+    if negated is True or line[:2] in ("\\!", "\\#"):
+        line = line[1:]
+    directory_only = line.endswith("/")
+    line = line.rstrip("/")
+    if line == "":
+        return None
+    # Patterns containing a slash are relative to the .gitignore, others match a name at any depth
+    anchored = "/" in line
+    line = line.lstrip("/")
+
+    regex = ""
+    i = 0
+    while i < len(line):
+        if line.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif line.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif line[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif line[i] == "?":
+            regex += "[^/]"
+            i += 1
+        elif line[i] == "[" and "]" in line[i + 2 :]:
+            end = line.index("]", i + 2)
+            characters = line[i + 1 : end]
+            if characters[0] == "!":
+                characters = "^" + characters[1:]
+            regex += "[" + characters.replace("\\", "\\\\") + "]"
+            i = end + 1
+        elif line[i] == "\\" and i + 1 < len(line):
+            regex += re.escape(line[i + 1])
+            i += 2
+        else:
+            regex += re.escape(line[i])
+            i += 1
+    if anchored is False:
+        regex = "(?:.*/)?" + regex
+    return re.compile(regex + "$"), negated, directory_only
+
+
+# Returns the rules of the .gitignore file in directory, or None if it has none
+def read_gitignore(directory):
+    try:
+        with open(os.path.join(directory, ".gitignore"), encoding="utf-8") as file:
+            lines = file.readlines()
+    except (OSError, UnicodeDecodeError):
+        return None
+    rules = [rule for rule in map(parse_gitignore_line, lines) if rule is not None]
+    return rules if len(rules) != 0 else None
+
+
+# Yields the Python files below directories one at a time as they are found so that parsing can start straight away.
+# Excluded and ignored directories are pruned before they are listed and every directory is only walked once, which
+# also stops symbolic link cycles.
+class FileFinder:
+    def __init__(self, include=None, exclude=None, gitignore=True):
+        self.include = tuple(include) if include else DEFAULT_INCLUDES
+        self.exclude = DEFAULT_EXCLUDES + tuple(exclude or ())
+        self.gitignore = gitignore
+
+    # Returns true if the glob matches the path relative to the searched directory or its last component
+    def match(self, globs, relative_path, name):
+        return any(
+            fnmatch.fnmatchcase(relative_path, glob) or fnmatch.fnmatchcase(name, glob)
+            for glob in globs
+        )
+
+    # Returns true if the last matching .gitignore rule that applies to path ignores it
+    def is_ignored(self, path, is_directory, rule_sets):
+        ignored = False
+        for base, rules in rule_sets:
+            relative_path = path[len(base) :].lstrip(os.sep).replace(os.sep, "/")
+            for regex, negated, directory_only in rules:
+                if directory_only is True and is_directory is False:
+                    continue
+                if regex.match(relative_path) is not None:
+                    ignored = not negated
+        return ignored
+
+    # Returns the rules of the .gitignore files above directory up to the root of the repository it is in
+    def get_parent_rules(self, directory):
+        rule_sets = []
+        parent = os.path.dirname(directory)
+        while os.path.exists(os.path.join(directory, ".git")) is False:
+            if parent == directory:
+                # Not in a repository so the .gitignore files above do not apply
+                return []
+            rules = read_gitignore(parent)
+            if rules is not None:
+                rule_sets.insert(0, (parent, rules))
+            directory, parent = parent, os.path.dirname(parent)
+        return rule_sets
+
+    def walk(self, directory):
+        rule_sets = self.get_parent_rules(directory) if self.gitignore else []
+        visited = set()
+        # Directories to walk with the .gitignore rules that apply to them. Walked depth first in the order they are
+        # listed, like os.walk().
+        stack = [(directory, rule_sets)]
+        while len(stack) != 0:
+            path, rule_sets = stack.pop()
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if (stat.st_dev, stat.st_ino) in visited:
+                continue
+            visited.add((stat.st_dev, stat.st_ino))
+
+            if self.gitignore is True:
+                rules = read_gitignore(path)
+                if rules is not None:
+                    rule_sets = rule_sets + [(path, rules)]
+            try:
+                with os.scandir(path) as scanner:
+                    entries = list(scanner)
+            except OSError:
+                continue
+            # Installed packages are not the project's code, unless the virtualenv itself is searched
+            if path != directory and any(
+                entry.name == VIRTUALENV_MARKER for entry in entries
+            ):
+                continue
+
+            subdirectories = []
+            for entry in entries:
+                relative_path = (
+                    entry.path[len(directory) :].lstrip(os.sep).replace(os.sep, "/")
+                )
+                try:
+                    is_directory = entry.is_dir()
+                except OSError:
+                    is_directory = False
+                if self.match(self.exclude, relative_path, entry.name):
+                    continue
+                if self.gitignore is True and self.is_ignored(
+                    entry.path, is_directory, rule_sets
+                ):
+                    continue
+                if is_directory is True:
+                    subdirectories.append((entry.path, rule_sets))
+                elif self.match(self.include, relative_path, entry.name):
+                    yield entry.path
+            stack.extend(reversed(subdirectories))
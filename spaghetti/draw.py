@@ -1,44 +1,129 @@
 import os
+import shutil
+import sys
 import time
 
-import matplotlib.pyplot as plt
-import networkx
-
 try:
+    from spaghetti.export import iter_dot
+    from spaghetti.levels import GroupNode
     from spaghetti.state import Mode
 except ImportError:
+    from export import iter_dot
+    from levels import GroupNode
     from state import Mode
 
+# Layouts that can be chosen with --layout. dot and sfdp are run by Graphviz, which must be installed, and spring is
+# computed by networkx and drawn with matplotlib. auto uses spring for small graphs and sfdp for larger ones.
+LAYOUTS = ("auto", "spring", "dot", "sfdp")
+IMAGE_FORMATS = ("png", "svg")
+# Largest graph drawn with the spring layout when the layout is auto. Its cost grows with the square of the nodes and
+# the result is unreadable well before this.
+SPRING_LIMIT = 300
+
+
+# Creates an image of the supplied Networkx graph and saves it to a relative folder. Functions can be grouped by the
+# module they are in. Returns the path of the image, or None if it could not be drawn.
+def draw_graph(
+    nxg, title, mode=Mode.NORMAL, layout="auto", image_format="png", cluster=False
+):
+    if layout == "auto":
+        if nxg.number_of_nodes() <= SPRING_LIMIT or shutil.which("sfdp") is None:
+            layout = "spring"
+        else:
+            layout = "sfdp"
+
+    # Creates a relative directory if it does not already exist
+    directory = "dependency_graphs"
+    if not os.path.isdir(directory):
+        os.mkdir(directory)
+    filename = directory + os.sep + "graph_" + repr(time.time()) + "." + image_format
+
+    if layout == "spring":
+        draw_spring(nxg, title, mode, filename, cluster)
+    else:
+        program = shutil.which(layout)
+        if program is None:
+            print(
+                "Error: Graphviz's %s was not found. Install Graphviz or use the spring layout."
+                % layout,
+                file=sys.stderr,
+            )
+            return None
+        import subprocess
+
+        nodes = list(nxg)
+        ids = {node: i for i, node in enumerate(nodes)}
+        edges = ((ids[source], ids[target]) for source, target in nxg.edges())
+        source = "\n".join(iter_dot(nodes, edges, title, cluster)) + "\n"
+        try:
+            subprocess.run(
+                [program, "-T" + image_format, "-o", filename],
+                input=source.encode(),
+                stderr=subprocess.PIPE,
+                check=True,
+            )
+        except subprocess.CalledProcessError as error:
+            message = error.stderr.decode(errors="replace").strip()
+            print(
+                "Error: Graphviz's %s failed: %s"
+                % (layout, message or "exit status %d" % error.returncode),
+                file=sys.stderr,
+            )
+            return None
+    return filename
+
+
+# Draws the graph with matplotlib on a figure of its own so that repeated calls do not draw on top of each other
+def draw_spring(nxg, title, mode, filename, cluster=False):
+    # Imported here because loading matplotlib takes longer than many searches
+    import matplotlib.pyplot as plt
+    import networkx
 
-# Creates an image of the supplied Networkx graph and saves it to a relative folder
-def draw_graph(nxg, title, mode=Mode.NORMAL):
     if mode is Mode.SIMPLE:
         node_size = 400
         width = 4
         font_size = 20
     else:
-        plt.title(title)
         node_size = 75
         width = 2
         font_size = 10
 
-    # pos = networkx.spectral_layout(nxg)  # More symmetrical but can't handle larger graphs well
-    pos = networkx.spring_layout(nxg, k=3)
-    networkx.draw_networkx_nodes(nxg, pos, node_size=node_size)
-    networkx.draw_networkx_edges(nxg, pos, edge_color="blue", arrowsize=40, width=width)
-    description = networkx.draw_networkx_labels(
-        nxg, pos, font_size=font_size, font_family="sans-serif", font_weight="bold"
-    )
-    # Prevents label text from being obstructed
-    for node, t in description.items():
-        t.set_clip_on(False)
+    figure, axes = plt.subplots()
+    try:
+        if mode is not Mode.SIMPLE:
+            axes.set_title(title)
+        node_options = {"node_size": node_size}
+        if all(isinstance(node, GroupNode) for node in nxg):
+            # The area of each class, module or package grows with the number of functions in it
+            node_options["node_size"] = [node_size * node.weight**0.5 for node in nxg]
+        if cluster is True:
+            # Colours the functions of each module alike
+            modules = {}
+            node_options["node_color"] = [
+                modules.setdefault(node.get_path(), len(modules)) for node in nxg
+            ]
+            node_options["cmap"] = "tab20"
 
-    # Creates a relative directory if it does not already exist
-    directory = "dependency_graphs"
-    if not os.path.isdir(directory):
-        os.mkdir(directory)
+        # pos = networkx.spectral_layout(nxg)  # More symmetrical but can't handle larger graphs well
+        pos = networkx.spring_layout(nxg, k=3)
+        networkx.draw_networkx_nodes(nxg, pos, ax=axes, **node_options)
+        networkx.draw_networkx_edges(
+            nxg, pos, edge_color="blue", arrowsize=40, width=width, ax=axes
+        )
+        description = networkx.draw_networkx_labels(
+            nxg,
+            pos,
+            font_size=font_size,
+            font_family="sans-serif",
+            font_weight="bold",
+            ax=axes,
+        )
+        # Prevents label text from being obstructed
+        for node, t in description.items():
+            t.set_clip_on(False)
 
-    # Saves the image to a file
-    filename = "graph_" + repr(time.time()) + ".png"
-    plt.axis("off")
-    plt.savefig(directory + os.sep + filename)
+        # Saves the image to a file
+        axes.axis("off")
+        figure.savefig(filename)
+    finally:
+        plt.close(figure)
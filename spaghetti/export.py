@@ -0,0 +1,239 @@
+import json
+
+try:
+    from spaghetti.csr_graph import CSRGraph
+    from spaghetti.func_node import FuncNode
+    from spaghetti.state import Mode
+except ImportError:
+    from csr_graph import CSRGraph
+    from func_node import FuncNode
+    from state import Mode
+
+# Formats that --format can write. Every format except text holds every node and its calls, from caller to callee.
+FORMATS = ("text", "jsonl", "graphml", "dot", "npz")
+# Formats written as bytes instead of text
+BINARY_FORMATS = ("npz",)
+# Changed whenever the layout of the npz format changes
+NPZ_VERSION = 1
+
+GRAPHML_KEYS = (
+    ("path", "string"),
+    ("class", "string"),
+    ("name", "string"),
+    ("label", "string"),
+    ("secondary", "boolean"),
+)
+
+
+# Writes the search's graph to out in the given format. out is opened in binary mode for BINARY_FORMATS. cluster groups
+# functions by module in the dot format.
+def write_graph(search, graph_format, out, title="", cluster=False):
+    csr = search.get_csr_graph(secondary=True)
+    if graph_format == "npz":
+        write_npz(search, csr, out)
+        return
+    if graph_format == "jsonl":
+        lines = iter_jsonl(csr)
+    elif graph_format == "graphml":
+        lines = iter_graphml(csr)
+    elif graph_format == "dot":
+        lines = iter_dot(csr.nodes, iter_csr_edges(csr), title, cluster)
+    else:
+        raise ValueError("unknown format %s" % graph_format)
+    for line in lines:
+        out.write(line + "\n")
+
+
+# Yields a JSON object for every node followed by one for every call. The nodes and edges of aggregated graphs also
+# have the number of functions and calls they stand for as their weight.
+def iter_jsonl(csr):
+    for node_id, node in enumerate(csr.nodes):
+        record = {
+            "type": "node",
+            "id": node_id,
+            "path": node.get_path(),
+            "class": node.get_class(),
+            "name": node.get_name(),
+            "label": repr(node),
+            "secondary": node.is_secondary(),
+        }
+        if csr.dependency_weights is not None:
+            record["weight"] = node.weight
+        yield json.dumps(record)
+    for node_id in range(csr.number_of_nodes()):
+        weights = csr.get_edge_weights(node_id, dependency=True)
+        for i, dependency_id in enumerate(csr.get_edges(node_id, dependency=True)):
+            record = {"type": "edge", "source": node_id, "target": dependency_id}
+            if weights is not None:
+                record["weight"] = weights[i]
+            yield json.dumps(record)
+
+
+# Yields the lines of a GraphML document
+def iter_graphml(csr):
+    from xml.sax.saxutils import escape
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>'
+    yield '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">'
+    for key, key_type in GRAPHML_KEYS:
+        yield '  <key id="%s" for="node" attr.name="%s" attr.type="%s"/>' % (
+            key,
+            key,
+            key_type,
+        )
+    yield '  <graph id="G" edgedefault="directed">'
+    for node_id, node in enumerate(csr.nodes):
+        values = (
+            node.get_path(),
+            node.get_class(),
+            node.get_name(),
+            repr(node),
+            "true" if node.is_secondary() else "false",
+        )
+        yield '    <node id="n%d">%s</node>' % (
+            node_id,
+            "".join(
+                '<data key="%s">%s</data>' % (key[0], escape(value))
+                for key, value in zip(GRAPHML_KEYS, values)
+            ),
+        )
+    for node_id, dependency_id in iter_csr_edges(csr):
+        yield '    <edge source="n%d" target="n%d"/>' % (node_id, dependency_id)
+    yield "  </graph>"
+    yield "</graphml>"
+
+
+# Returns the string as a quoted Graphviz ID
+def quote_dot(string):
+    return '"' + string.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+# Yields the lines of a Graphviz DOT graph of the nodes and the (source, target) pairs of indices into nodes in edges.
+# If cluster is true the functions of each module are grouped in a box labelled with the module.
+def iter_dot(nodes, edges, title="", cluster=False):
+    yield "digraph %s {" % quote_dot(title)
+    if cluster is True:
+        modules = {}
+        for node_id, node in enumerate(nodes):
+            modules.setdefault(node.get_path(), []).append(node_id)
+        for module_id, (path, node_ids) in enumerate(modules.items()):
+            yield "  subgraph cluster_%d {" % module_id
+            yield "    label=%s;" % quote_dot(path)
+            for node_id in node_ids:
+                yield "    n%d [label=%s];" % (node_id, quote_dot(repr(nodes[node_id])))
+            yield "  }"
+    else:
+        for node_id, node in enumerate(nodes):
+            yield "  n%d [label=%s];" % (node_id, quote_dot(repr(node)))
+    for source_id, target_id in edges:
+        yield "  n%d -> n%d;" % (source_id, target_id)
+    yield "}"
+
+
+# Yields (caller, callee) pairs of node ids for every call in the CSRGraph
+def iter_csr_edges(csr):
+    for node_id in range(csr.number_of_nodes()):
+        for dependency_id in csr.get_edges(node_id, dependency=True):
+            yield node_id, dependency_id
+
+
+# Writes the graph as NumPy arrays: a string table of UTF-8 bytes with their offsets, node columns indexing into it,
+# and the rows of nodes each node calls as in CSRGraph. The messages printed with the text output are kept as well.
+# load_npz() reads it back without parsing anything.
+def write_npz(search, csr, out):
+    import numpy
+
+    string_ids = {}
+
+    def get_string_ids(strings):
+        return numpy.array(
+            [string_ids.setdefault(string, len(string_ids)) for string in strings],
+            dtype=numpy.int64,
+        )
+
+    node_columns = {
+        "filename": get_string_ids(node.get_path() for node in csr.nodes),
+        "class_name": get_string_ids(node.get_class() for node in csr.nodes),
+        "name": get_string_ids(node.get_name() for node in csr.nodes),
+    }
+    messages = {
+        "files": get_string_ids(search.files),
+        "searched_files": get_string_ids(sorted(search.searched_files)),
+        "searched_directories": get_string_ids(sorted(search.searched_directories)),
+        "crawled_imports": get_string_ids(sorted(search.crawled_imports)),
+        "uncrawled": get_string_ids(sorted(search.uncrawled)),
+        "unsure_nodes": get_string_ids(sorted(search.unsure_nodes)),
+    }
+    encoded = [string.encode("utf-8", "surrogateescape") for string in string_ids]
+    string_offsets = numpy.zeros(len(encoded) + 1, dtype=numpy.int64)
+    numpy.cumsum([len(string) for string in encoded], out=string_offsets[1:])
+    dependency_offsets, dependency_ids = csr.get_numpy_rows(dependency=True)
+
+    numpy.savez_compressed(
+        out,
+        version=numpy.array([NPZ_VERSION]),
+        strings=numpy.frombuffer(b"".join(encoded), dtype=numpy.uint8),
+        string_offsets=string_offsets,
+        depth=numpy.array([node.get_depth() for node in csr.nodes], dtype=numpy.int64),
+        dependency_offsets=dependency_offsets,
+        dependency_ids=dependency_ids,
+        **node_columns,
+        **messages,
+    )
+
+
+# Reads a graph written by write_npz(). Returns a CSRGraph of FuncNodes that also have their edges, and a dictionary
+# of the sets and lists of strings Search keeps about the search.
+def load_npz(file, mode=Mode.NORMAL):
+    import numpy
+
+    with numpy.load(file, allow_pickle=False) as arrays:
+        if int(arrays["version"][0]) != NPZ_VERSION:
+            raise ValueError("unsupported graph version %d" % arrays["version"][0])
+        strings_bytes = arrays["strings"].tobytes()
+        string_offsets = arrays["string_offsets"].tolist()
+        strings = [
+            strings_bytes[start:end].decode("utf-8", "surrogateescape")
+            for start, end in zip(string_offsets, string_offsets[1:])
+        ]
+
+        def get_strings(name):
+            return [strings[i] for i in arrays[name].tolist()]
+
+        nodes = [
+            FuncNode(
+                filename=filename,
+                class_name=class_name,
+                name=name,
+                depth=depth,
+                mode=mode,
+            )
+            for filename, class_name, name, depth in zip(
+                get_strings("filename"),
+                get_strings("class_name"),
+                get_strings("name"),
+                arrays["depth"].tolist(),
+            )
+        ]
+        csr = CSRGraph.from_rows(
+            nodes,
+            arrays["dependency_offsets"].tolist(),
+            arrays["dependency_ids"].tolist(),
+        )
+        for node_id, node in enumerate(nodes):
+            node.get_edges(dependency=True).update(
+                nodes[edge_id] for edge_id in csr.get_edges(node_id, dependency=True)
+            )
+            node.get_edges(dependency=False).update(
+                nodes[edge_id] for edge_id in csr.get_edges(node_id, dependency=False)
+            )
+
+        metadata = {
+            "files": get_strings("files"),
+            "searched_files": set(get_strings("searched_files")),
+            "searched_directories": set(get_strings("searched_directories")),
+            "crawled_imports": set(get_strings("crawled_imports")),
+            "uncrawled": set(get_strings("uncrawled")),
+            "unsure_nodes": set(get_strings("unsure_nodes")),
+        }
+    return csr, metadata
@@ -0,0 +1,73 @@
+import os
+
+# Directions --focus can follow calls in. in finds the functions calling the focused ones, which are the ones a change
+# can break, and out the functions they call.
+DIRECTIONS = ("in", "out", "both")
+
+
+# Splits a focus such as module:Class.function into (module, class name, function name). The module and class are
+# empty if they are left out.
+def parse_focus(focus):
+    module, _, qualified_name = focus.rpartition(":")
+    class_name, _, name = qualified_name.rpartition(".")
+    if name == "":
+        raise ValueError("no function given in %s" % focus)
+    return module, class_name, name
+
+
+# Returns true if the path is the module, given as a filename, a path ending in it or a dotted module name
+def match_module(path, module):
+    if module == "":
+        return True
+    module_path = module.replace(".", os.sep)
+    candidates = (
+        module,
+        module + ".py",
+        module_path + ".py",
+        os.path.join(module_path, "__init__.py"),
+    )
+    return any(
+        path == candidate or path.endswith(os.sep + candidate)
+        for candidate in candidates
+    )
+
+
+# Returns the nodes the focus names. A focus without a class matches functions in any class.
+def match_nodes(nodes, focus):
+    module, class_name, name = parse_focus(focus)
+    return [
+        node
+        for node in nodes
+        if node.get_name() == name
+        and (class_name == "" or node.get_class() == class_name)
+        and match_module(node.get_path(), module)
+    ]
+
+
+# Returns the nodes at most depth calls away from the starting nodes in the direction, or every node they reach if
+# depth is None, found breadth first so that nothing beyond the depth is visited. The edges of a node can hold equal
+# copies of other nodes, so graph maps every node to the one in the graph holding its edges, like Search.graph.
+# Secondary nodes such as builtins and imported modules are found but not followed, since everything calling print
+# is not related by it.
+def get_neighbourhood(graph, nodes, depth=1, direction="both"):
+    if direction not in DIRECTIONS:
+        raise ValueError("unknown direction %s" % direction)
+    # Followed edges, False for the dependents of a node and True for its dependencies
+    dependencies = {"in": (False,), "out": (True,), "both": (False, True)}[direction]
+    found = set(nodes)
+    frontier = list(found)
+    distance = 0
+    while depth is None or distance < depth:
+        distance += 1
+        next_frontier = []
+        for node in frontier:
+            for dependency in dependencies:
+                for edge in node.get_edges(dependency=dependency):
+                    if edge not in found and edge in graph:
+                        found.add(graph[edge])
+                        if not graph[edge].is_secondary():
+                            next_frontier.append(graph[edge])
+        if len(next_frontier) == 0:
+            break
+        frontier = next_frontier
+    return found
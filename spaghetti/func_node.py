@@ -1,4 +1,5 @@
 import os
+import sys
 
 try:
     from spaghetti.state import Mode
@@ -6,50 +7,78 @@ except ImportError:
     from state import Mode
 
 
-# Represents function nodes in the graph
+# Represents function nodes in the graph. Uses slots and interned strings because large searches create a node for
+# every function they find.
 class FuncNode:
+    __slots__ = (
+        "_filename",
+        "_class_name",
+        "_name",
+        "_depth",
+        "_key",
+        "_string",
+        "_hash",
+        "_dependencies",
+        "_dependents",
+        "_display_filename",
+        "_display_mode",
+        "mode",
+    )
+
     def __init__(
         self,
         filename="",
         class_name="",
         name="",
         depth=0,
-        ast_node=None,
         mode=Mode.NORMAL,
     ):
-        self._filename = filename
-        self._class_name = class_name
-        self._name = name
+        self._filename = sys.intern(filename)
+        self._class_name = sys.intern(class_name)
+        self._name = sys.intern(name)
         self._depth = depth
+        # Identifies the node. Computed once because nodes are compared and hashed constantly. A tuple so that names
+        # that only differ in where the filename, class name and name split, such as A.dd and Add, stay apart.
+        self._key = (self._filename, self._class_name, self._name)
+        self._hash = hash(self._key)
+        # Only used to sort nodes
+        self._string = self._filename + self._class_name + self._name
 
         # All of the other nodes this node calls.
         self._dependencies = set()
         # All the other nodes that call this node.
         self._dependents = set()
-        self._ast_node = ast_node
+        self._display_filename = None
+        self._display_mode = None
         self.mode = mode
 
     def __repr__(self):
         return self.get_filename() + self._class_name + "." + self._name
 
     def __eq__(self, other):
-        return (
-            self.__class__ == other.__class__
-            and self.get_string() == other.get_string()
-        )
+        return self.__class__ == other.__class__ and self._key == other._key
 
     # This prevents creating multiple nodes at the same position in the graph
     def __hash__(self):
-        return hash((self._filename, self._class_name, self._name))
+        return self._hash
 
     # Displays filename and hides directory information depending on the mode
     def get_filename(self):
-        if self.mode is Mode.LONG:
-            return self._filename.split(os.getcwd() + os.sep)[-1] + ":"
-        elif self.mode is Mode.NORMAL:
-            return self._filename.split(os.sep)[-1] + ":"
-        else:
-            return ""
+        if self._display_mode is not self.mode:
+            if self.mode is Mode.LONG:
+                self._display_filename = (
+                    self._filename.split(os.getcwd() + os.sep)[-1] + ":"
+                )
+            elif self.mode is Mode.NORMAL:
+                self._display_filename = self._filename.split(os.sep)[-1] + ":"
+            else:
+                self._display_filename = ""
+            self._display_mode = self.mode
+        return self._display_filename
+
+    # Returns the unformatted filename the node was defined in
+    def get_path(self):
+        return self._filename
 
     def get_class(self):
         return self._class_name
@@ -57,23 +86,32 @@ class FuncNode:
     def get_name(self):
         return self._name
 
+    def get_depth(self):
+        return self._depth
+
+    def set_depth(self, depth):
+        self._depth = depth
+
     def add_edge(self, edge, dependency=False):
         if dependency is True:
             self._dependencies.add(edge)
         else:
             self._dependents.add(edge)
 
+    def remove_edge(self, edge, dependency=False):
+        if dependency is True:
+            self._dependencies.discard(edge)
+        else:
+            self._dependents.discard(edge)
+
     def get_edges(self, dependency=False):
         if dependency is True:
             return self._dependencies
         else:
             return self._dependents
 
-    def get_ast_node(self):
-        return self._ast_node
-
     def get_string(self):
-        return self._filename + self._class_name + self._name
+        return self._string
 
     # Returns true if identifier might be used by the AST to identify the node
     def is_identifier(self, identifier):
@@ -104,13 +142,13 @@ class FuncNode:
 
     # Returns a string of all the edges
     def get_edges_str(self, dependency=False):
-        return_str = ""
-        for edge in sorted(
-            self.get_edges(dependency=dependency),
-            key=lambda the_node: the_node.get_string(),
-        ):
-            return_str += "(" + repr(edge) + ") "
-        return return_str
+        return "".join(
+            "(" + repr(edge) + ") "
+            for edge in sorted(
+                self.get_edges(dependency=dependency),
+                key=lambda the_node: the_node.get_string(),
+            )
+        )
 
     def get_indegree(self):
         return len(self._dependents)
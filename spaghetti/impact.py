@@ -0,0 +1,138 @@
+import os
+import re
+
+try:
+    from spaghetti.func_node import FuncNode
+except ImportError:
+    from func_node import FuncNode
+
+# Matches the header of a hunk of a diff and captures where its lines start in the new file and how many there are
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+# Last line of files that are new since the revision, which changed everywhere
+END_OF_FILE = float("inf")
+
+
+# Returns the output of git run in the directory holding path. Raises ValueError if git fails.
+def git(path, *arguments):
+    import subprocess
+
+    directory = path if os.path.isdir(path) else os.path.dirname(path) or "."
+    try:
+        return subprocess.run(
+            ["git", "-c", "core.quotepath=off", "-C", directory] + list(arguments),
+            capture_output=True,
+            check=True,
+            encoding="utf-8",
+            errors="surrogateescape",
+        ).stdout
+    except FileNotFoundError:
+        raise ValueError("git was not found")
+    except subprocess.CalledProcessError as error:
+        raise ValueError(error.stderr.strip() or "git %s failed" % arguments[0])
+
+
+# Returns the parse cache directory impact uses when none is given, inside the .git directory of the repository holding
+# path so that it is neither searched nor committed. Raises ValueError if git fails.
+def get_cache_directory(path="."):
+    return os.path.join(
+        git(path, "rev-parse", "--absolute-git-dir").strip(), "spaghetti"
+    )
+
+
+# Returns the lines changed in every file of the git repository holding the paths since the revision, including
+# changes that are not committed and files git does not track yet. Maps each absolute filename to a list of (first
+# line, last line) ranges. Searches the current directory if no paths are given. Raises ValueError if git fails, the
+# paths are in different repositories or the revision starts with "-", which git would read as an option.
+def get_changed_lines(since, *paths):
+    if since.startswith("-"):
+        raise ValueError("revision %s cannot start with -" % since)
+
+    roots = set()
+    for path in paths or (".",):
+        roots.add(git(path, "rev-parse", "--show-toplevel").strip())
+    if len(roots) > 1:
+        raise ValueError(
+            "the files are in different git repositories: %s" % ", ".join(sorted(roots))
+        )
+    root = roots.pop()
+    changed_lines = parse_diff(
+        git(root, "diff", "--unified=0", "--no-color", "--no-ext-diff", since, "--"),
+        root,
+    )
+    # Listed relative to the root of the repository
+    for filename in git(
+        root, "ls-files", "--others", "--exclude-standard"
+    ).splitlines():
+        changed_lines[os.path.join(root, *filename.split("/"))] = [(1, END_OF_FILE)]
+    return changed_lines
+
+
+# Returns the changed line ranges of each file in a diff with no context lines, with paths relative to root. Deleted
+# files are left out and a deletion counts as a change to the lines on both sides of it.
+def parse_diff(diff, root):
+    changed_lines = {}
+    filename = None
+    for line in diff.splitlines():
+        if line.startswith("+++ "):
+            path = line[4:].strip('"')
+            if path == "/dev/null":
+                filename = None
+            else:
+                if path.startswith("b/"):
+                    path = path[2:]
+                filename = os.path.join(root, *path.split("/"))
+        elif line.startswith("@@") and filename is not None:
+            match = HUNK_HEADER.match(line)
+            if match is None:
+                continue
+            start = int(match.group(1))
+            count = int(match.group(2)) if match.group(2) is not None else 1
+            if count == 0:
+                changed_lines.setdefault(filename, []).append(
+                    (max(start, 1), start + 1)
+                )
+            else:
+                changed_lines.setdefault(filename, []).append(
+                    (start, start + count - 1)
+                )
+    return changed_lines
+
+
+# Returns the nodes of the searched files defined on the changed lines. A change belongs to the innermost function or
+# class holding all of it and the ones nested in it that it overlaps. Changes that are not held by one belong to every
+# function and class they overlap and to the code run when the module is imported, its __main__ node.
+def find_changed_nodes(search, changed_lines):
+    files = {os.path.realpath(file): file for file in search.files}
+    nodes = set()
+    for filename, ranges in changed_lines.items():
+        file = files.get(os.path.realpath(filename))
+        if file is None:
+            continue
+        # (class name, function name, first line, last line) of every function and class
+        spans = [
+            definition[1:]
+            for definition in search.modules[file].definitions
+            if definition[0] == "def"
+        ]
+        names = set()
+        for first, last in ranges:
+            overlapping = [
+                span for span in spans if span[2] <= last and span[3] >= first
+            ]
+            holding = [
+                span for span in overlapping if span[2] <= first and span[3] >= last
+            ]
+            if len(holding) != 0:
+                # Spans nest, so the one starting last is the innermost
+                innermost = max(holding, key=lambda the_span: the_span[2])
+                overlapping = [span for span in overlapping if span[2] >= innermost[2]]
+            else:
+                names.add(("", "__main__"))
+            names.update((span[0], span[1]) for span in overlapping)
+        for class_name, name in names:
+            node = search.graph.get(
+                FuncNode(filename=file, class_name=class_name, name=name)
+            )
+            if node is not None:
+                nodes.add(node)
+    return nodes
@@ -0,0 +1,80 @@
+import importlib.machinery
+import os
+import sys
+
+# Returned when a module name could not be found on the import path
+NOT_FOUND = (False, None)
+
+
+# Maps module names to their source files by searching the import path like the import system's path finder does,
+# without importing or executing anything. Builtin modules, extension modules and namespace packages are found but have
+# no source file. Changes made to a package's __path__ at import time are not taken into account.
+class ImportResolver:
+    def __init__(self, path=None):
+        if path is None:
+            path = sys.path
+        self.path = [os.path.abspath(entry) for entry in path]
+        # Cached results of resolve() and of the directory listings they needed
+        self.modules = {}
+        self.directories = {}
+
+    # Returns (found, filename) for the given module name. filename is None if the module has no Python source. A
+    # list of directories can be given to search instead of the import path, which is how relative imports are found.
+    def resolve(self, name, path=None):
+        key = (name, None if path is None else tuple(path))
+        if key not in self.modules:
+            self.modules[key] = self.find(name, path)
+        return self.modules[key]
+
+    def list_directory(self, directory):
+        if directory not in self.directories:
+            try:
+                self.directories[directory] = frozenset(os.listdir(directory))
+            except OSError:
+                self.directories[directory] = frozenset()
+        return self.directories[directory]
+
+    def find(self, name, path=None):
+        parts = name.split(".")
+        if not all(part.isidentifier() for part in parts):
+            return NOT_FOUND
+        if path is None:
+            if name in sys.builtin_module_names:
+                return True, None
+            directories = self.path
+        else:
+            directories = [os.path.abspath(entry) for entry in path]
+        for i, part in enumerate(parts):
+            last = i == len(parts) - 1
+            namespace_directories = []
+            found_package = False
+            for directory in directories:
+                entries = self.list_directory(directory)
+                if part in entries:
+                    package = os.path.join(directory, part)
+                    if "__init__.py" in self.list_directory(package):
+                        if last:
+                            return True, os.path.join(package, "__init__.py")
+                        directories = [package]
+                        found_package = True
+                        break
+                    elif os.path.isdir(package):
+                        namespace_directories.append(package)
+
+                # Modules cannot contain submodules so anything after them does not exist
+                for suffix in importlib.machinery.EXTENSION_SUFFIXES:
+                    if part + suffix in entries:
+                        return (True, None) if last else NOT_FOUND
+                for suffix in importlib.machinery.SOURCE_SUFFIXES:
+                    if part + suffix in entries:
+                        if last:
+                            return True, os.path.join(directory, part + suffix)
+                        return NOT_FOUND
+
+            if found_package is False:
+                if len(namespace_directories) == 0:
+                    return NOT_FOUND
+                if last:
+                    return True, None
+                directories = namespace_directories
+        return NOT_FOUND
@@ -0,0 +1,126 @@
+import os
+
+try:
+    from spaghetti.csr_graph import CSRGraph
+    from spaghetti.func_node import FuncNode
+    from spaghetti.state import Mode
+except ImportError:
+    from csr_graph import CSRGraph
+    from func_node import FuncNode
+    from state import Mode
+
+# Levels that --level can graph at. Every level above function collapses the functions in each class, module or
+# package into one node.
+LEVELS = ("function", "class", "module", "package")
+
+
+# Represents every function of a class, module or package as one node of an aggregated graph. weight is the number of
+# functions it holds. Functions outside of classes are grouped by module at the class level.
+class GroupNode(FuncNode):
+    __slots__ = ("level", "weight")
+
+    def __init__(
+        self,
+        filename="",
+        class_name="",
+        level="module",
+        depth=0,
+        weight=0,
+        mode=Mode.NORMAL,
+    ):
+        super().__init__(
+            filename=filename, class_name=class_name, depth=depth, mode=mode
+        )
+        self.level = level
+        self.weight = weight
+
+    def __repr__(self):
+        if self.mode is Mode.LONG:
+            path = self._filename.split(os.getcwd() + os.sep)[-1]
+        else:
+            path = self._filename.split(os.sep)[-1]
+        if self._class_name == "":
+            return path
+        elif self.mode is Mode.SIMPLE:
+            return self._class_name
+        else:
+            return path + ":" + self._class_name
+
+
+# Returns the filename and class name of the group the node belongs to at the given level
+def get_group(node, level):
+    if level == "class":
+        return node.get_path(), node.get_class()
+    elif level == "module":
+        return node.get_path(), ""
+    elif level == "package":
+        # Builtins and unknown functions have a name instead of a path and stay on their own
+        return os.path.dirname(node.get_path()) or node.get_path(), ""
+    else:
+        raise ValueError("unknown level %s" % level)
+
+
+# Collapses the nodes of a function level CSRGraph into a GroupNode for each class, module or package. Two groups are
+# joined by an edge if any of their functions are, weighted by the number of calls between them, and calls within a
+# group are left out. Only the grouping looks at each node; the edges are collapsed in one pass over the CSR arrays.
+def aggregate(csr, level, mode=Mode.NORMAL):
+    import numpy
+
+    group_ids = {}
+    members = numpy.array(
+        [
+            group_ids.setdefault(get_group(node, level), len(group_ids))
+            for node in csr.nodes
+        ],
+        dtype=numpy.int64,
+    )
+    groups = [
+        GroupNode(filename=filename, class_name=class_name, level=level, mode=mode)
+        for filename, class_name in group_ids
+    ]
+
+    # Renumbers the groups in the sorted order CSRGraph keeps its nodes in
+    order = sorted(range(len(groups)), key=lambda i: groups[i].get_string())
+    ranks = numpy.empty(len(groups), dtype=numpy.int64)
+    ranks[order] = numpy.arange(len(groups), dtype=numpy.int64)
+    members = ranks[members]
+    nodes = [groups[i] for i in order]
+
+    weights = numpy.bincount(members, minlength=len(nodes))
+    depths = numpy.full(len(nodes), numpy.iinfo(numpy.int64).max, dtype=numpy.int64)
+    numpy.minimum.at(
+        depths,
+        members,
+        numpy.array([node.get_depth() for node in csr.nodes], dtype=numpy.int64),
+    )
+    for node, weight, depth in zip(nodes, weights.tolist(), depths.tolist()):
+        node.weight = weight
+        node.set_depth(depth)
+
+    # Maps every call to a pair of groups and counts the distinct pairs. numpy.unique() sorts them by caller and then
+    # callee, which is the order of the CSR rows.
+    offsets, ids = csr.get_numpy_rows(dependency=True)
+    sources = numpy.repeat(members, numpy.diff(offsets))
+    targets = members[ids]
+    outside = sources != targets
+    pairs, counts = numpy.unique(
+        sources[outside] * len(nodes) + targets[outside], return_counts=True
+    )
+    sources, targets = numpy.divmod(pairs, max(len(nodes), 1))
+    dependency_offsets = numpy.zeros(len(nodes) + 1, dtype=numpy.int64)
+    numpy.cumsum(
+        numpy.bincount(sources, minlength=len(nodes)), out=dependency_offsets[1:]
+    )
+
+    graph = CSRGraph.from_rows(
+        nodes, dependency_offsets.tolist(), targets.tolist(), counts.tolist()
+    )
+    # The edges are kept on the nodes too, like the nodes of a search
+    for node_id, node in enumerate(nodes):
+        node.get_edges(dependency=True).update(
+            nodes[edge_id] for edge_id in graph.get_edges(node_id, dependency=True)
+        )
+        node.get_edges(dependency=False).update(
+            nodes[edge_id] for edge_id in graph.get_edges(node_id, dependency=False)
+        )
+    return graph
@@ -1,38 +1,146 @@
+import functools
 import statistics
 
-import networkx
+try:
+    from spaghetti.csr_graph import CSRGraph
+except ImportError:
+    from csr_graph import CSRGraph
 
+# Largest connected graph whose node connectivity is computed exactly. Above this only an upper bound is given because
+# the exact computation runs a maximum flow for many pairs of nodes.
+EXACT_CONNECTIVITY_LIMIT = 1000
+# Most calls in a graph whose node connectivity is computed exactly. Aggregated module and package graphs have few
+# nodes but are dense, and every maximum flow grows with the number of edges.
+EXACT_CONNECTIVITY_EDGE_LIMIT = 5000
 
-# Stores useful measurements on the given Networkx graph
+
+# Stores useful measurements on the given Networkx graph or CSRGraph. Each measurement is computed the first time it is
+# used and then cached so that callers only pay for the ones they need. networkx is only imported by the measurements
+# that need it so that a CSRGraph can be measured without loading it.
 class Measurements:
-    def __init__(self, nxg):
-        if not isinstance(nxg, networkx.classes.digraph.DiGraph):
-            raise TypeError
-        self.nxg = nxg
-
-        degree_sequence = sorted([d for n, d in self.nxg.degree()], reverse=True)
-        # all_pairs_con = networkx.algorithms.approximation.connectivity.all_pairs_node_connectivity(self.nxg)
-        all_pairs_con = (
-            networkx.algorithms.connectivity.connectivity.all_pairs_node_connectivity(
-                self.nxg.to_undirected()
+    def __init__(
+        self,
+        nxg,
+        exact_connectivity_limit=EXACT_CONNECTIVITY_LIMIT,
+        exact_connectivity_edge_limit=EXACT_CONNECTIVITY_EDGE_LIMIT,
+    ):
+        if isinstance(nxg, CSRGraph):
+            # Everything except exact connectivity comes straight from the CSR arrays
+            self.csr = nxg
+            self.nxg = None
+        else:
+            import networkx
+
+            if isinstance(nxg, networkx.classes.digraph.DiGraph) is False:
+                raise TypeError
+            self.csr = None
+            self.nxg = nxg
+        self.exact_connectivity_limit = exact_connectivity_limit
+        self.exact_connectivity_edge_limit = exact_connectivity_edge_limit
+
+    @functools.cached_property
+    def node_num(self):
+        if self.csr is not None:
+            return self.csr.number_of_nodes()
+        else:
+            return self.nxg.number_of_nodes()
+
+    @functools.cached_property
+    def edge_num(self):
+        if self.csr is not None:
+            return self.csr.number_of_edges()
+        else:
+            return self.nxg.number_of_edges()
+
+    @functools.cached_property
+    def degree_sequence(self):
+        if self.csr is not None:
+            degrees = (int(d) for d in self.csr.get_degrees())
+        else:
+            degrees = (d for n, d in self.nxg.degree())
+        return sorted(degrees, reverse=True)
+
+    # Both are 0 for an empty graph, such as an impact report with nothing changed
+    @functools.cached_property
+    def max_degree(self):
+        return max(self.degree_sequence, default=0)
+
+    @functools.cached_property
+    def mean_degree(self):
+        if len(self.degree_sequence) == 0:
+            return 0.0
+        return statistics.mean(self.degree_sequence)
+
+    @functools.cached_property
+    def component_sizes(self):
+        if self.csr is not None:
+            component_sizes = self.csr.get_component_sizes()
+        else:
+            import networkx
+
+            component_sizes = [
+                len(component)
+                for component in networkx.weakly_connected_components(self.nxg)
+            ]
+        return sorted(component_sizes, reverse=True)
+
+    # Two functions are connected exactly when they are in the same component, so the number of connected ordered
+    # pairs is a sum over the component sizes
+    @functools.cached_property
+    def severity(self):
+        potential_pairs = self.node_num * (self.node_num - 1)
+        if potential_pairs == 0:
+            return 0.0
+        connected_pairs = sum(size * (size - 1) for size in self.component_sizes)
+        return 100 - 100 * (connected_pairs / potential_pairs)
+
+    # None if the graph is too large to compute it exactly. node_connectivity_bound is given instead.
+    @functools.cached_property
+    def node_connectivity(self):
+        # A graph with isolated groups has a node connectivity of 0 without computing anything
+        if len(self.component_sizes) != 1:
+            return 0
+        elif (
+            self.node_num <= self.exact_connectivity_limit
+            and self.edge_num <= self.exact_connectivity_edge_limit
+        ):
+            import networkx
+
+            return networkx.algorithms.connectivity.connectivity.node_connectivity(
+                self.get_nx_graph().to_undirected()
             )
-        )
+        else:
+            return None
 
-        self.node_num = self.nxg.number_of_nodes()
-        self.node_connectivity = (
-            networkx.algorithms.connectivity.connectivity.node_connectivity(
-                self.nxg.to_undirected()
+    @functools.cached_property
+    def node_connectivity_bound(self):
+        if self.node_connectivity is None:
+            return self.get_min_neighbours()
+        else:
+            return None
+
+    def get_nx_graph(self):
+        if self.nxg is None:
+            self.nxg = self.csr.to_networkx()
+        return self.nxg
+
+    # Returns the smallest number of distinct neighbours of any function, an upper bound of the node connectivity
+    def get_min_neighbours(self):
+        if self.csr is not None:
+            return min(
+                len(
+                    set(self.csr.get_edges(node_id, dependency=True))
+                    .union(self.csr.get_edges(node_id))
+                    .difference((node_id,))
+                )
+                for node_id in range(self.node_num)
+            )
+        else:
+            return min(
+                len(
+                    set(self.nxg.predecessors(node))
+                    .union(self.nxg.successors(node))
+                    .difference((node,))
+                )
+                for node in self.nxg
             )
-        )
-        self.max_degree = max(degree_sequence)
-        self.mean_degree = statistics.mean(degree_sequence)
-
-        num_connected_nodes = 0
-        potential_pairs = 0
-        for node in all_pairs_con:
-            for pair in all_pairs_con[node]:
-                potential_pairs += 1
-                if all_pairs_con[node][pair] > 0:
-                    num_connected_nodes += 1
-
-        self.severity = 100 - 100 * (num_connected_nodes / potential_pairs)
@@ -0,0 +1,59 @@
+import sys
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# Returns the peak resident memory of the process in megabytes or None if the platform cannot report it
+def get_peak_memory():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes while macOS reports bytes
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+# A Search hook that adds up the time spent in each phase and in each file
+class Profiler:
+    def __init__(self, slowest_files=0):
+        self.slowest_files = slowest_files
+        # Phases in the order they first finished
+        self.phase_seconds = {}
+        self.file_seconds = {}
+
+    def __call__(self, phase, seconds, file=None):
+        self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + seconds
+        if file is not None:
+            self.file_seconds[file] = self.file_seconds.get(file, 0.0) + seconds
+
+    # Returns the slowest files and the seconds spent on each of them
+    def get_slowest_files(self, number):
+        return sorted(
+            self.file_seconds.items(), key=lambda item: item[1], reverse=True
+        )[:number]
+
+    # Yields the lines of a report on the phases and the size of the given search
+    def iter_report_lines(self, search):
+        yield "%-24s %10s" % ("Phase", "Seconds")
+        for phase, seconds in self.phase_seconds.items():
+            yield "%-24s %10.3f" % (phase, seconds)
+        yield "%-24s %10.3f" % ("total", sum(self.phase_seconds.values()))
+        yield ""
+        yield "Files: %d" % len(search.files)
+        yield "Functions: %d" % len(search.graph)
+        yield "Edges: %d" % sum(
+            len(node.get_edges(dependency=True)) for node in search.graph
+        )
+        peak_memory = get_peak_memory()
+        if peak_memory is not None:
+            yield "Peak memory: %.1f MB" % peak_memory
+
+        if self.slowest_files > 0:
+            yield ""
+            yield "Slowest files:"
+            for file, seconds in self.get_slowest_files(self.slowest_files):
+                yield "%10.3f %s" % (seconds, file)
@@ -1,106 +1,648 @@
-import ast
+import builtins
+import collections
+import concurrent.futures
+import contextlib
 import os
-
-import networkx
+import time
 
 try:
-    from spaghetti.ast_parser import EdgeDetector, NodeCreator
+    from spaghetti.ast_parser import (
+        NodeCreator,
+        extract_symbols,
+        read_source,
+        release_source,
+    )
+    from spaghetti.cache import ParseCache
+    from spaghetti.csr_graph import CSRGraph
+    from spaghetti.discovery import FileFinder
+    from spaghetti.export import load_npz
+    from spaghetti.focus import get_neighbourhood, match_nodes
+    from spaghetti.func_node import FuncNode
+    from spaghetti.imports import ImportResolver
+    from spaghetti.levels import aggregate
     from spaghetti.state import Mode
 except ImportError:
-    from ast_parser import EdgeDetector, NodeCreator
+    from ast_parser import NodeCreator, extract_symbols, read_source, release_source
+    from cache import ParseCache
+    from csr_graph import CSRGraph
+    from discovery import FileFinder
+    from export import load_npz
+    from focus import get_neighbourhood, match_nodes
+    from func_node import FuncNode
+    from imports import ImportResolver
+    from levels import aggregate
     from state import Mode
 
+BUILTIN_NAMES = frozenset(dir(builtins))
+# Filenames of the nodes add_edge() creates for calls it cannot resolve
+PLACEHOLDER_FILES = ("System", "Unknown")
+# Most files read ahead of the parser at once when reading in threads
+READ_AHEAD = 64
+
 
 # Conducts a search of given filenames or directories. Produces a Networkx functional dependency graph and associated metadata.
 class Search:
-    def __init__(self, filenames, inverse=False, mode=Mode.NORMAL):
+    def __init__(
+        self,
+        filenames,
+        inverse=False,
+        mode=Mode.NORMAL,
+        jobs=1,
+        cache_dir=None,
+        hooks=None,
+        import_depth=1,
+        include=None,
+        exclude=None,
+        gitignore=True,
+        read_threads=4,
+        level="function",
+    ):
         self.filenames = filenames
         self.inverse = inverse
         self.mode = mode
+        # Graphs every class, module or package as one node instead of every function unless this is function
+        self.level = level
+        # Number of processes used to parse files. 0 or less uses every available core.
+        self.jobs = jobs if jobs > 0 else os.cpu_count() or 1
+        # Number of threads reading searched files while earlier ones are parsed. 0 reads each file when it is parsed.
+        self.read_threads = read_threads
+        # Reuses the symbols of unchanged files from previous runs if a cache directory is given
+        self.cache = ParseCache(cache_dir) if cache_dir is not None else None
+        # Callables run as hook(phase, seconds, filename) whenever a phase of the search finishes. seconds excludes
+        # the time spent in phases nested inside it and filename is None for phases that are not about one file.
+        self.hooks = list(hooks) if hooks is not None else []
+        self.phase_stack = []
+        # How many levels of imports are followed from the searched files. 0 does not crawl imports.
+        self.import_depth = import_depth
+        # Picks the files searched in directories using globs and .gitignore files
+        self.finder = FileFinder(include=include, exclude=exclude, gitignore=gitignore)
 
-        self.tree = {}
-        self.creator = {}
+        # Calls recorded for each searched file, resolved into edges once every node exists
+        self.calls = {}
+        # Shared module cache mapping each parsed file to its FileSymbols so that no file is parsed more than once,
+        # and each crawled file to the smallest import depth it was crawled at
+        self.modules = {}
+        self.module_depths = {}
         self.files = []
         self.graph = {}
         self.nxg = None
+        # CSRGraph snapshots with and without secondary nodes, built on demand, and the same graphs aggregated to the
+        # level
+        self.csr = {}
+        self.aggregates = {}
+        # The (focus, depth, direction) given to set_focus() and the nodes it limits the graph to, None for all of them
+        self.focus = None
+        self.focus_nodes = None
+
+        # Index used to resolve calls without scanning the graph. Maps each function name, and each class name to
+        # its __init__ node, to the matching nodes in the order they were added. homes holds the same nodes keyed by
+        # (name, identifier) for each filename, class name and function name identifying them.
+        self.symbols = {}
+        self.homes = {}
+        # Maps each filename to the nodes defined in it and each called name to the files calling it so that
+        # update() can find what a change affects
+        self.file_nodes = {}
+        self.callers = {}
 
         self.searched_files = set()
         self.searched_directories = set()
         self.crawled_imports = set()
         self.uncrawled = set()
         self.unsure_nodes = set()
+        # Finds imported modules without importing them
+        self.resolver = ImportResolver()
 
         # Begins main execution
         self.crawl_files()
         self.create_edges()
 
-    # Finds the all Python files in the filenames list and calls create_nodes() to add them
+    # Returns a Search holding a graph saved with --format npz without searching or parsing anything. The calls and
+    # the symbol index are not saved so the loaded search cannot be updated.
+    @classmethod
+    def load(cls, path, inverse=False, mode=Mode.NORMAL, hooks=None, level="function"):
+        search = cls([], inverse=inverse, mode=mode, hooks=hooks, level=level)
+        with search.phase("load"):
+            csr, metadata = load_npz(path, mode)
+            search.graph = {node: node for node in csr.nodes}
+            search.csr[True] = csr
+            for name, value in metadata.items():
+                setattr(search, name, value)
+        return search
+
+    # Finds the all Python files in the filenames list and adds them to the graph
     def crawl_files(self):
-        for filename in self.filenames:
-            filename = os.path.abspath(os.path.expanduser(filename))
+        files = self.iter_phase("crawl", self.find_files())
+        if self.jobs > 1:
+            self.create_nodes_parallel(list(files))
+        else:
+            for file, source in self.read_ahead(files):
+                self.create_nodes(file, source)
+        if self.cache is not None:
+            with self.phase("cache"):
+                self.cache.prune()
+
+    # Times the enclosed code and reports it to the hooks when it finishes
+    @contextlib.contextmanager
+    def phase(self, name, file=None):
+        if len(self.hooks) == 0:
+            yield
+            return
+        start = time.perf_counter()
+        self.phase_stack.append(0.0)
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            nested_seconds = self.phase_stack.pop()
+            if len(self.phase_stack) != 0:
+                self.phase_stack[-1] += seconds
+            for hook in self.hooks:
+                hook(name, seconds - nested_seconds, file)
+
+    # Yields the items of iterable, timing the work done to produce each of them as the given phase
+    def iter_phase(self, name, iterable):
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    # Returns the absolute path of a name in the filenames list
+    def get_search_path(self, filename):
+        filename = os.path.abspath(os.path.expanduser(filename))
+        # Adds ".py" to the end of the file if that was not specified.
+        if not os.path.isdir(filename) and filename[-3:] != ".py":
+            filename += ".py"
+        return filename
+
+    # Yields every Python file in the filenames list
+    def find_files(self):
+        for filename in map(self.get_search_path, self.filenames):
             if os.path.isdir(filename):
                 self.searched_directories.add(filename + os.sep)
-                for file in os.walk(filename, followlinks=True):
-                    for i in range(len(file[2])):
-                        found_filename = file[0] + os.sep + file[2][i]
-                        if found_filename[-3:] == ".py":
-                            self.create_nodes(found_filename)
+                yield from self.finder.walk(filename)
+            elif os.path.isfile(filename):
+                self.searched_files.add(filename)
+                yield filename
+            else:
+                print("Error: Could not find %s" % filename)
+
+    # Yields every Python file in the filenames list like find_files() but without recording what was searched or
+    # reporting missing files, so that the search area can be polled for changes
+    def list_files(self):
+        for filename in map(self.get_search_path, self.filenames):
+            if os.path.isdir(filename):
+                yield from self.finder.walk(filename)
+            elif os.path.isfile(filename):
+                yield filename
+
+    # Yields each file with a future of its read_source() result, or None if it is to be read when it is parsed. Files
+    # are read in a thread pool so that slow storage is waited on while earlier files are parsed, and no more than
+    # READ_AHEAD of them are held at once. Files the parse cache might hold are not read ahead.
+    def read_ahead(self, files):
+        if self.read_threads < 1 or self.cache is not None:
+            for file in files:
+                yield file, None
+            return
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.read_threads
+        ) as pool:
+            pending = collections.deque()
+            for file in files:
+                pending.append((file, pool.submit(read_source, file)))
+                if len(pending) >= READ_AHEAD:
+                    yield pending.popleft()
+            while len(pending) != 0:
+                yield pending.popleft()
+
+    # Creates nodes in the given file. Its calls are kept for create_edges() so the AST is dropped straight away.
+    def create_nodes(self, file, source=None):
+        self.add_symbols(self.extract(file, source))
+
+    # Parses the given files in a process pool and adds their symbols to the graph in the original order
+    def create_nodes_parallel(self, files):
+        missing = []
+        for file in files:
+            with self.phase("cache", file):
+                file_symbols = self.cache.get(file) if self.cache is not None else None
+            if file_symbols is None:
+                missing.append(file)
             else:
-                # Adds ".py" to the end of the file if that was not specified.
-                if filename[-3:] != ".py":
-                    filename += ".py"
-                if os.path.isfile(filename):
-                    self.searched_files.add(filename)
-                    self.create_nodes(filename)
+                self.modules[file] = file_symbols
+
+        if len(missing) != 0:
+            chunksize = max(1, len(missing) // (self.jobs * 4))
+            with self.phase(
+                "parallel_extraction"
+            ), concurrent.futures.ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                for file_symbols in pool.map(
+                    extract_symbols, missing, chunksize=chunksize
+                ):
+                    self.modules[file_symbols.filename] = file_symbols
+                    if self.cache is not None:
+                        with self.phase("cache", file_symbols.filename):
+                            self.cache.put(file_symbols)
+
+        for file in files:
+            self.add_symbols(self.modules[file])
+
+    # Returns the symbols of the given file, parsing it only if it is in neither the module cache nor the parse cache.
+    # source can be a future of the file's read_source() result if it is already being read.
+    def extract(self, file, source=None):
+        if file in self.modules:
+            if source is not None:
+                release_source(source.result())
+            return self.modules[file]
+        file_symbols = None
+        if self.cache is not None:
+            with self.phase("cache", file):
+                file_symbols = self.cache.get(file)
+        if file_symbols is None:
+            if source is not None:
+                with self.phase("read", file):
+                    source = source.result()
+            with self.phase("symbol_extractor", file):
+                file_symbols = extract_symbols(file, source)
+            if self.cache is not None:
+                with self.phase("cache", file):
+                    self.cache.put(file_symbols)
+        self.modules[file] = file_symbols
+        return file_symbols
+
+    # Adds the definitions found by a SymbolExtractor to the graph. Files from the primary search area also crawl
+    # their imports and keep their calls for create_edges().
+    def add_symbols(self, file_symbols, depth=0):
+        file = file_symbols.filename
+        self.module_depths[file] = min(depth, self.module_depths.get(file, depth))
+        creator = NodeCreator(search=self, filename=file, recursive=depth)
+        with self.phase("node_creator", file):
+            for definition in file_symbols.definitions:
+                if definition[0] == "import":
+                    if depth < self.import_depth:
+                        with self.phase("import_crawling"):
+                            creator.crawl_import(definition[1])
+                elif definition[0] == "import_from":
+                    if depth < self.import_depth:
+                        with self.phase("import_crawling"):
+                            creator.crawl_import_from(*definition[1:])
                 else:
-                    print("Error: Could not find %s" % filename)
+                    self.add_node(
+                        FuncNode(
+                            filename=file,
+                            class_name=definition[1],
+                            name=definition[2],
+                            depth=depth,
+                            mode=self.mode,
+                        )
+                    )
+        if depth == 0:
+            self.calls[file] = file_symbols.calls
+            self.files.append(file)
 
-    # Creates nodes in the given file
-    def create_nodes(self, file):
-        self.tree[file] = ast.parse(open(file).read())
-        creator = NodeCreator(search=self, filename=file)
-        creator.visit(self.tree[file])
-        self.files.append(file)
+    # Adds the functions and classes of an imported module to the graph unless it was already crawled at this depth or
+    # closer to the searched files
+    def crawl_module(self, file, depth):
+        if self.module_depths.get(file, depth + 1) > depth:
+            self.add_symbols(self.extract(file), depth)
 
-    # Creates all edges for the graph
+    # Creates all edges for the graph by resolving the calls recorded for each file against the symbol index
     def create_edges(self):
         for file in self.files:
-            detector = EdgeDetector(search=self, filename=file)
-            detector.visit(self.tree[file])
+            with self.phase("edge_detector", file):
+                for call in self.calls[file]:
+                    self.add_call(file, *call)
+
+    # Adds the given node to the graph if it is not already in it
+    def add_node(self, node):
+        if node not in self.graph:
+            self.graph[node] = node
+            self.index_node(node)
+        elif node.get_depth() < self.graph[node].get_depth():
+            # Searched files that an earlier file imported belong to the search area
+            self.graph[node].set_depth(node.get_depth())
+
+    # Adds a node that was just inserted into the graph to the symbol index
+    def index_node(self, node):
+        for name in self.get_symbol_names(node):
+            self.symbols.setdefault(name, []).append(node)
+            for identifier in self.get_identifiers(node):
+                self.homes.setdefault((name, identifier), []).append(node)
+        self.file_nodes.setdefault(node.get_path(), []).append(node)
+
+    # Returns the strings for which FuncNode.is_identifier() is true
+    def get_identifiers(self, node):
+        return {node.get_path(), node.get_class(), node.get_name()}
+
+    # Returns the names calls can use to refer to the node
+    def get_symbol_names(self, node):
+        names = [node.get_name()]
+        if node.get_name() == "__init__" and node.get_class() != "__init__":
+            names.append(node.get_class())
+        return names
+
+    # Removes a node, its edges and its index entries from the graph
+    def remove_node(self, node):
+        node = self.graph.pop(node)
+        for name in self.get_symbol_names(node):
+            self.symbols[name].remove(node)
+            if len(self.symbols[name]) == 0:
+                del self.symbols[name]
+            for identifier in self.get_identifiers(node):
+                self.homes[(name, identifier)].remove(node)
+                if len(self.homes[(name, identifier)]) == 0:
+                    del self.homes[(name, identifier)]
+        for dependency in node.get_edges(dependency=True):
+            dependency.remove_edge(node, dependency=False)
+        for dependent in node.get_edges(dependency=False):
+            dependent.remove_edge(node, dependency=True)
+        if self.nxg is not None and node in self.nxg:
+            self.nxg.remove_node(node)
+
+    # Adds an edge for a call to dependency made from the given function. home is the name the dependency was called
+    # on, which is used to pick between functions with the same name.
+    def add_call(self, filename, class_name, function_name, dependency, home):
+        self.callers.setdefault(dependency, set()).add(filename)
+        candidates = self.symbols.get(dependency, ())
+        matches = self.homes.get((dependency, home), ())
+
+        # Selects the first node sharing the name that home identifies, or else the first node sharing the name
+        dependency_node = None
+        if len(candidates) != 0:
+            if len(matches) != 0:
+                dependency_node = matches[0]
+            else:
+                dependency_node = candidates[0]
+            # If several nodes share the name the call is ambiguous unless only the first of them matches home
+            if len(candidates) > 1 and not (
+                len(matches) == 1 and matches[0] is candidates[0]
+            ):
+                self.unsure_nodes.add(
+                    filename + ":" + function_name + "(" + dependency + ")"
+                )
+
+        # Creates this node if it was not already in the graph
+        this_node = FuncNode(
+            filename=filename,
+            class_name=class_name,
+            name=function_name or "__main__",
+            mode=self.mode,
+        )
+
+        self.add_edge(dependency, this_node, dependency_node)
+
+    # Adds an edge to the graph
+    def add_edge(self, dependency, this_node, dependency_node=None):
+        # Error handling if the node's identity could not be determined
+        if dependency_node is None:
+            if dependency in BUILTIN_NAMES:  # sys.builtin_module_names
+                class_name = "Builtins"
+                dependency_file = "System"
+            else:
+                class_name = "Unknown"
+                dependency_file = "Unknown"
+            dependency_node = FuncNode(
+                filename=dependency_file,
+                class_name=class_name,
+                name=dependency,
+                depth=1,
+                mode=self.mode,
+            )
+
+        # Ensures that the relevant nodes are in the graph if they were not already
+        self.add_node(this_node)
+        self.add_node(dependency_node)
+
+        # This works even if the node was not added to the graph because the existing node's hash would be the same.
+        self.graph[this_node].add_edge(dependency_node, dependency=True)
+        self.graph[dependency_node].add_edge(this_node, dependency=False)
+
+    # Returns true if add_edge() created the node for calls it could not resolve
+    def is_placeholder(self, node):
+        return node.get_path() in PLACEHOLDER_FILES
+
+    # Refreshes the graph after the given files were changed, added or deleted. Only the changed files and the files
+    # calling functions that were defined in them are analysed again. Ambiguous calls are resolved in the order the
+    # nodes were added, which can differ from a full search. Placeholders for names the changed files now define are
+    # removed so that their calls reach the new functions, and placeholders no longer called are removed too. Changed
+    # files that cannot be parsed are reported and left out.
+    def update(self, changed_files):
+        changed_files = [
+            os.path.abspath(os.path.expanduser(file)) for file in changed_files
+        ]
+        named_files = set(map(self.get_search_path, self.filenames))
+        affected = set()
+        searched = set()
+        # Nodes that lost a dependent, which are removed if they are placeholders nothing calls any more
+        dropped = set()
+        for file in changed_files:
+            affected.add(file)
+            if (
+                file in self.files
+                or file in named_files
+                or any(
+                    file.startswith(directory)
+                    for directory in self.searched_directories
+                )
+            ):
+                searched.add(file)
+            self.modules.pop(file, None)
+            self.module_depths.pop(file, None)
+            for node in self.file_nodes.pop(file, []):
+                for name in self.get_symbol_names(node):
+                    affected.update(self.callers.get(name, ()))
+                dropped.update(node.get_edges(dependency=True))
+                self.remove_node(node)
+            self.calls.pop(file, None)
+            if file in self.files:
+                self.files.remove(file)
+
+        for file in changed_files:
+            if not os.path.isfile(file):
+                self.searched_files.discard(file)
+                continue
+            try:
+                if file not in searched:
+                    # Only imported by the search area so it is crawled again as an import
+                    self.crawl_module(file, 1)
+                    continue
+                file_symbols = self.extract(file)
+            except (SyntaxError, ValueError, OSError) as error:
+                # Files are often saved half written while they are edited, so the file is left out of the graph
+                # until it is changed again
+                print("Error: Could not parse %s: %s" % (file, error))
+                continue
+            if file in named_files:
+                self.searched_files.add(file)
+            self.add_symbols(file_symbols)
+            for definition in file_symbols.definitions:
+                if definition[0] == "def":
+                    names = [definition[2]]
+                    if definition[2] == "__init__":
+                        names.append(definition[1])
+                    for name in names:
+                        affected.update(self.callers.get(name, ()))
+                        for node in list(self.symbols.get(name, ())):
+                            if self.is_placeholder(node):
+                                self.remove_node(node)
+
+        # Removes the edges created by calls in the affected files before resolving those calls again
+        affected_files = [file for file in self.files if file in affected]
+        prefixes = tuple(file + ":" for file in affected)
+        self.unsure_nodes = {
+            unsure for unsure in self.unsure_nodes if not unsure.startswith(prefixes)
+        }
+        for file in affected_files:
+            for node in self.file_nodes.get(file, ()):
+                for dependency in node.get_edges(dependency=True):
+                    dependency.remove_edge(node, dependency=False)
+                dropped.update(node.get_edges(dependency=True))
+                node.get_edges(dependency=True).clear()
+            if file not in self.calls:
+                self.calls[file] = self.extract(file).calls
+        for file in affected_files:
+            for call in self.calls[file]:
+                self.add_call(file, *call)
+        for node in dropped:
+            node = self.graph.get(node)
+            if (
+                node is not None
+                and self.is_placeholder(node)
+                and len(node.get_edges(dependency=False)) == 0
+            ):
+                self.remove_node(node)
+
+        self.csr = {}
+        self.aggregates = {}
+        if self.focus is not None:
+            self.set_focus(*self.focus)
+        elif self.level != "function":
+            self.nxg = None
+        elif self.nxg is not None:
+            for file in affected_files:
+                for node in self.file_nodes.get(file, ()):
+                    self.update_nx_node(node)
+
+    # Brings a node's dependencies in the networkx graph up to date with the search graph
+    def update_nx_node(self, node):
+        if node.is_secondary() is True:
+            return
+        if node not in self.nxg:
+            self.nxg.add_node(node)
+        if self.inverse is False:
+            self.nxg.remove_edges_from(list(self.nxg.in_edges(node)))
+        else:
+            self.nxg.remove_edges_from(list(self.nxg.out_edges(node)))
+        for dependency in node.get_edges(dependency=True):
+            if dependency.is_secondary() is False:
+                if dependency not in self.nxg:
+                    self.nxg.add_node(dependency)
+                if self.inverse is False:
+                    self.nxg.add_edge(dependency, node)
+                else:
+                    self.nxg.add_edge(node, dependency)
 
     def get_graph(self):
         return self.graph
 
+    # Limits the graphs built from now on to the functions at most depth calls away from the ones the focus names,
+    # such as module:Class.function, following calls in the direction. Returns the named functions.
+    def set_focus(self, focus, depth=1, direction="both"):
+        with self.phase("focus"):
+            nodes = match_nodes(self.graph, focus)
+        self.focus_on(nodes, depth, direction)
+        self.focus = (focus, depth, direction)
+        return nodes
+
+    # Limits the graphs built from now on to the functions at most depth calls away from the given nodes, or every
+    # function they reach if depth is None
+    def focus_on(self, nodes, depth=1, direction="both"):
+        with self.phase("focus"):
+            self.focus_nodes = get_neighbourhood(self.graph, nodes, depth, direction)
+        self.focus = None
+        self.csr = {}
+        self.aggregates = {}
+        self.nxg = None
+
+    # Returns the nodes in the focus, or the whole graph if there is none
+    def get_focused_nodes(self):
+        if self.focus_nodes is None:
+            return self.graph
+        return self.focus_nodes
+
     # Gets a networkx representation of the graph. Does not include nodes that are not from the primary search area
-    # so that the measurement is more precise.
+    # so that the measurement is more precise, or nodes outside the focus. Aggregated levels are converted from their
+    # much smaller CSRGraph.
     def get_nx_graph(self):
         if self.nxg is not None:
             return self.nxg
+        elif self.level != "function":
+            csr = self.get_csr_graph()
+            with self.phase("networkx"):
+                self.nxg = csr.to_networkx(inverse=self.inverse)
+            return self.nxg
         else:
-            nxg = networkx.DiGraph()
-            for node in self.graph:
-                if node.is_secondary() is False:
-                    nxg.add_node(node)
-            for node in self.graph:
-                if node.is_secondary() is False:
-                    for edge in node.get_edges():
-                        if edge.is_secondary() is False:
-                            if self.inverse is False:
-                                nxg.add_edge(node, edge)
-                            else:
-                                nxg.add_edge(edge, node)
+            with self.phase("networkx"):
+                import networkx
+
+                nodes = self.get_focused_nodes()
+                nxg = networkx.DiGraph()
+                for node in nodes:
+                    if node.is_secondary() is False:
+                        nxg.add_node(node)
+                for node in nodes:
+                    if node.is_secondary() is False:
+                        for edge in node.get_edges():
+                            if edge.is_secondary() is False and edge in nodes:
+                                if self.inverse is False:
+                                    nxg.add_edge(node, edge)
+                                else:
+                                    nxg.add_edge(edge, node)
             self.nxg = nxg
             return nxg
 
-    # Returns a textual representation of the graph
-    def get_graph_str(self, indent=0):
-        # Prints each line of the data.
-        graph_str = ""
-        format_string = "%" + indent + "s %" + indent + "s\n"
-        for node in sorted(self.graph, key=lambda the_node: the_node.get_string()):
-            if node.is_hidden() is False:
-                graph_str += format_string % (
-                    node,
-                    node.get_edges_str(dependency=self.inverse),
+    # Gets an integer-ID CSRGraph of the graph at the search's level. Like get_nx_graph() it leaves out nodes outside
+    # the focus, and nodes that are not from the primary search area unless secondary is true.
+    def get_csr_graph(self, secondary=False):
+        if secondary not in self.csr:
+            with self.phase("csr_graph"):
+                self.csr[secondary] = CSRGraph(
+                    node
+                    for node in self.get_focused_nodes()
+                    if secondary is True or node.is_secondary() is False
+                )
+        if self.level == "function":
+            return self.csr[secondary]
+        if secondary not in self.aggregates:
+            with self.phase("aggregate"):
+                self.aggregates[secondary] = aggregate(
+                    self.csr[secondary], self.level, self.mode
                 )
-        return graph_str
+        return self.aggregates[secondary]
+
+    # Yields a line of text for each visible node and its edges without building the whole output in memory. Edges of
+    # aggregated levels are followed by the number of calls they stand for.
+    def iter_graph_lines(self, indent=""):
+        format_string = "%" + str(indent) + "s %" + str(indent) + "s"
+        # Nodes and their edges are already sorted by name in the CSRGraph
+        csr = self.get_csr_graph(secondary=True)
+        for node_id, node in enumerate(csr.nodes):
+            if node.is_hidden() is False:
+                edge_ids = csr.get_edges(node_id, dependency=self.inverse)
+                weights = csr.get_edge_weights(node_id, dependency=self.inverse)
+                if weights is None:
+                    edges_str = "".join(
+                        "(" + repr(csr.nodes[edge_id]) + ") " for edge_id in edge_ids
+                    )
+                else:
+                    edges_str = "".join(
+                        "(%r x%d) " % (csr.nodes[edge_id], weight)
+                        for edge_id, weight in zip(edge_ids, weights)
+                    )
+                yield format_string % (node, edges_str)
+
+    # Returns a textual representation of the graph
+    def get_graph_str(self, indent=""):
+        return "".join(line + "\n" for line in self.iter_graph_lines(indent=indent))
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+from unittest import TestCase
+
+from spaghetti import ast_parser
+from spaghetti.ast_parser import extract_symbols, hash_source
+
+
+class ExtractSymbolsTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "module.py")
+        self.source = '# -*- coding: latin-1 -*-\ndef caf\xe9():\n    "\xe9"\n    f()\n'
+        with open(self.filename, "wb") as source_file:
+            source_file.write(self.source.encode("latin-1"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_encoding_declaration(self):
+        file_symbols = extract_symbols(self.filename)
+        self.assertEqual(file_symbols.definitions, [("def", "", "caf\xe9", 2, 4)])
+        self.assertEqual(
+            file_symbols.digest, hash_source(self.source.encode("latin-1"))
+        )
+
+    def test_memory_mapped_file(self):
+        threshold = ast_parser.MMAP_THRESHOLD
+        ast_parser.MMAP_THRESHOLD = 1
+        try:
+            source = ast_parser.read_source(self.filename)
+            self.assertNotIsInstance(source[0], bytes)
+            mapped_symbols = extract_symbols(self.filename, source)
+            self.assertTrue(source[0].closed)
+        finally:
+            ast_parser.MMAP_THRESHOLD = threshold
+        file_symbols = extract_symbols(self.filename)
+        self.assertEqual(mapped_symbols.definitions, file_symbols.definitions)
+        self.assertEqual(mapped_symbols.calls, file_symbols.calls)
+        self.assertEqual(mapped_symbols.digest, file_symbols.digest)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+from unittest import TestCase
+
+from spaghetti.ast_parser import extract_symbols
+from spaghetti.cache import ParseCache
+
+
+class ParseCacheTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "module.py")
+        with open(self.filename, "w") as source:
+            source.write("def a():\n    b()\n")
+        self.cache = ParseCache(os.path.join(self.directory.name, "cache"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_unchanged_file_is_cached(self):
+        self.assertIsNone(self.cache.get(self.filename))
+        self.cache.put(extract_symbols(self.filename))
+        file_symbols = self.cache.get(self.filename)
+        self.assertEqual(file_symbols.definitions, [("def", "", "a", 1, 2)])
+        self.assertEqual(file_symbols.calls, [("", "a", "b", self.filename)])
+
+    def test_changed_file_is_not_cached(self):
+        self.cache.put(extract_symbols(self.filename))
+        with open(self.filename, "a") as source:
+            source.write("def c():\n    pass\n")
+        self.assertIsNone(self.cache.get(self.filename))
+
+    def test_prune_respects_max_size(self):
+        self.cache.put(extract_symbols(self.filename))
+        self.cache.max_size = 0
+        self.cache.prune()
+        self.assertIsNone(self.cache.get(self.filename))
+
+
+if __name__ == "__main__":
+    # begin the unittest.main()
+    unittest.main()
@@ -1,7 +1,10 @@
 import io
+import os
+import subprocess
 import sys
 import unittest
-from unittest import TestCase
+from contextlib import redirect_stderr
+from unittest import TestCase, mock
 
 import spaghetti.command_line as cmd
 from spaghetti.state import Mode
@@ -28,6 +31,29 @@ class CommandLineTest(TestCase):
         args = cmd.get_input(self.name)
         self.assertEqual(args.mode, Mode.NORMAL)
 
+    def test_focus_without_function(self):
+        for focus in ("Foo.", "mod:"):
+            argv = ["spaghetti", "--focus", focus, self.name]
+            with mock.patch.object(sys, "argv", argv), redirect_stderr(io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    cmd.get_input()
+
+    def test_import_does_not_load_plotting_libraries(self):
+        root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, spaghetti.command_line; "
+                "print(sorted({'matplotlib', 'networkx', 'numpy'} & set(sys.modules)))",
+            ],
+            cwd=os.path.abspath(root),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
 
 if __name__ == "__main__":
     # begin the unittest.main()
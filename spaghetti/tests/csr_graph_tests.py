@@ -0,0 +1,45 @@
+import unittest
+from unittest import TestCase
+
+from spaghetti.csr_graph import CSRGraph
+from spaghetti.func_node import FuncNode
+
+
+class CSRGraphTest(TestCase):
+    def setUp(self):
+        self.a = FuncNode(name="a")
+        self.b = FuncNode(name="b")
+        self.c = FuncNode(name="c")
+        # a calls b and c, b calls c
+        for caller, callee in ((self.a, self.b), (self.a, self.c), (self.b, self.c)):
+            caller.add_edge(callee, dependency=True)
+            callee.add_edge(caller, dependency=False)
+        self.csr = CSRGraph([self.c, self.a, self.b])
+
+    def test_nodes_sorted(self):
+        self.assertEqual(self.csr.nodes, [self.a, self.b, self.c])
+
+    def test_edges(self):
+        a = self.csr.get_id(self.a)
+        c = self.csr.get_id(self.c)
+        self.assertEqual(list(self.csr.get_edges(a, dependency=True)), [1, 2])
+        self.assertEqual(list(self.csr.get_edges(c)), [0, 1])
+        self.assertEqual(self.csr.number_of_edges(), 3)
+
+    def test_degrees(self):
+        self.assertEqual(list(self.csr.get_degrees()), [2, 2, 2])
+        self.assertEqual(self.csr.get_indegree(self.csr.get_id(self.c)), 2)
+
+    def test_leaves_out_missing_nodes(self):
+        csr = CSRGraph([self.a, self.b])
+        self.assertEqual(csr.number_of_edges(), 1)
+
+    def test_to_networkx(self):
+        nxg = self.csr.to_networkx()
+        self.assertTrue(nxg.has_edge(self.b, self.a))
+        self.assertEqual(nxg.number_of_edges(), 3)
+
+
+if __name__ == "__main__":
+    # begin the unittest.main()
+    unittest.main()
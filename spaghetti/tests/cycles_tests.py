@@ -0,0 +1,58 @@
+import unittest
+from unittest import TestCase
+
+from spaghetti.csr_graph import CSRGraph
+from spaghetti.cycles import Cycles
+from spaghetti.func_node import FuncNode
+
+
+def create_graph(names, calls):
+    nodes = {name: FuncNode(name=name) for name in names}
+    for caller, callee in calls:
+        nodes[caller].add_edge(nodes[callee], dependency=True)
+        nodes[callee].add_edge(nodes[caller], dependency=False)
+    return CSRGraph(nodes.values())
+
+
+class CyclesTest(TestCase):
+    def setUp(self):
+        # a and b call each other, b calls c, c calls itself and d calls a
+        self.csr = create_graph(
+            "abcd", (("a", "b"), ("b", "a"), ("b", "c"), ("c", "c"), ("d", "a"))
+        )
+        self.cycles = Cycles(self.csr)
+
+    def get_names(self, node_ids):
+        return sorted(self.csr.nodes[node_id].get_name() for node_id in node_ids)
+
+    def test_cycles(self):
+        self.assertEqual(
+            [self.get_names(cycle) for cycle in self.cycles.cycles],
+            [["a", "b"], ["c"]],
+        )
+
+    def test_components(self):
+        self.assertEqual(len(self.cycles.components), 3)
+
+    def test_layers(self):
+        layers = [
+            self.get_names(
+                node_id
+                for component_id in layer
+                for node_id in self.cycles.components[component_id]
+            )
+            for layer in self.cycles.layers
+        ]
+        self.assertEqual(layers, [["c"], ["a", "b"], ["d"]])
+
+    def test_long_chain(self):
+        names = ["f%06d" % i for i in range(20000)]
+        csr = create_graph(names, zip(names, names[1:]))
+        cycles = Cycles(csr)
+        self.assertEqual(cycles.cycles, [])
+        self.assertEqual(len(cycles.layers), len(names))
+
+
+if __name__ == "__main__":
+    # begin the unittest.main()
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from unittest import TestCase
+
+from spaghetti.discovery import FileFinder, parse_gitignore_line
+
+
+class GitIgnoreTest(TestCase):
+    def matches(self, pattern, path):
+        regex = parse_gitignore_line(pattern)[0]
+        return regex.match(path) is not None
+
+    def test_patterns(self):
+        self.assertTrue(self.matches("build", "a/build"))
+        self.assertTrue(self.matches("/build", "build"))
+        self.assertFalse(self.matches("/build", "a/build"))
+        self.assertTrue(self.matches("*.py[cod]", "a/b.pyc"))
+        self.assertFalse(self.matches("*.py[cod]", "a/b.py"))
+        self.assertTrue(self.matches("docs/**/gen", "docs/a/b/gen"))
+        self.assertIsNone(parse_gitignore_line("# comment"))
+
+    def test_negation_and_directories(self):
+        self.assertEqual(parse_gitignore_line("!keep.py")[1:], (True, False))
+        self.assertEqual(parse_gitignore_line("venv/")[1:], (False, True))
+
+
+class FileFinderTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self.directory.name)
+        for path in (
+            "a.py",
+            "notes.txt",
+            "generated_b.py",
+            "package/c.py",
+            "package/build/d.py",
+            "package/keep.py",
+            ".git/hooks/e.py",
+            "node_modules/f.py",
+            ".venv/lib/g.py",
+            "env/pyvenv.cfg",
+            "env/lib/h.py",
+        ):
+            os.makedirs(os.path.dirname(os.path.join(self.root, path)), exist_ok=True)
+            open(os.path.join(self.root, path), "w").close()
+        with open(os.path.join(self.root, ".gitignore"), "w") as gitignore:
+            gitignore.write("build/\npackage/*.py\n!keep.py\n")
+        os.symlink(self.root, os.path.join(self.root, "package", "loop"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def find(self, **kwargs):
+        return sorted(
+            os.path.relpath(file, self.root)
+            for file in FileFinder(**kwargs).walk(self.root)
+        )
+
+    def test_gitignore_and_symlink_cycle(self):
+        self.assertEqual(
+            self.find(), ["a.py", "generated_b.py", os.path.join("package", "keep.py")]
+        )
+
+    def test_globs(self):
+        self.assertEqual(
+            self.find(exclude=["generated_*"], include=["*.py", "*.txt"]),
+            ["a.py", "notes.txt", os.path.join("package", "keep.py")],
+        )
+
+    def test_virtualenvs(self):
+        self.assertFalse(any(file.endswith("g.py") for file in self.find()))
+        self.assertFalse(any(file.endswith("h.py") for file in self.find()))
+        env = os.path.join(self.root, "env")
+        self.assertEqual(
+            list(FileFinder().walk(env)), [os.path.join(env, "lib", "h.py")]
+        )
+
+    def test_without_gitignore(self):
+        self.assertIn(
+            os.path.join("package", "build", "d.py"), self.find(gitignore=False)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
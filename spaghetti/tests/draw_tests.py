@@ -0,0 +1,54 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from unittest import TestCase, mock
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+
+from spaghetti.draw import draw_graph
+from spaghetti.search import Search
+
+DEMOS = os.path.join(os.path.dirname(__file__), "..", "..", "demos")
+
+
+class DrawGraphTest(TestCase):
+    def setUp(self):
+        self.nxg = Search([os.path.join(DEMOS, "ex_sub_package")]).get_nx_graph()
+        self.directory = tempfile.TemporaryDirectory()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        self.directory.cleanup()
+
+    def test_figures_are_closed(self):
+        first = draw_graph(self.nxg, "first", layout="spring")
+        second = draw_graph(
+            self.nxg, "second", layout="spring", image_format="svg", cluster=True
+        )
+        self.assertEqual(plt.get_fignums(), [])
+        self.assertTrue(os.path.isfile(first))
+        self.assertTrue(second.endswith(".svg"))
+
+    @unittest.skipIf(sys.platform == "win32", "needs a shell script")
+    def test_graphviz_failure_reported(self):
+        program = os.path.join(self.directory.name, "dot")
+        with open(program, "w") as script:
+            script.write("#!/bin/sh\necho 'bad layout' >&2\nexit 1\n")
+        os.chmod(program, 0o755)
+        err = io.StringIO()
+        with mock.patch("shutil.which", return_value=program), redirect_stderr(err):
+            self.assertIsNone(draw_graph(self.nxg, "graph", layout="dot"))
+        self.assertIn("Error: Graphviz's dot failed: bad layout", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
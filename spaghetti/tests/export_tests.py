@@ -0,0 +1,68 @@
+import io
+import json
+import os
+import unittest
+from unittest import TestCase
+
+import networkx
+
+from spaghetti.export import iter_dot, load_npz, write_graph
+from spaghetti.search import Search
+
+DEMOS = os.path.join(os.path.dirname(__file__), "..", "..", "demos")
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        self.search = Search([DEMOS])
+        self.csr = self.search.get_csr_graph(secondary=True)
+
+    def write(self, graph_format):
+        out = io.BytesIO() if graph_format == "npz" else io.StringIO()
+        write_graph(self.search, graph_format, out)
+        out.seek(0)
+        return out
+
+    def test_jsonl(self):
+        objects = [json.loads(line) for line in self.write("jsonl")]
+        nodes = [o for o in objects if o["type"] == "node"]
+        edges = [o for o in objects if o["type"] == "edge"]
+        self.assertEqual(len(nodes), self.csr.number_of_nodes())
+        self.assertEqual(len(edges), self.csr.number_of_edges())
+
+    def test_graphml(self):
+        graph = networkx.read_graphml(io.BytesIO(self.write("graphml").read().encode()))
+        self.assertEqual(graph.number_of_nodes(), self.csr.number_of_nodes())
+        self.assertEqual(graph.number_of_edges(), self.csr.number_of_edges())
+
+    def test_dot_quotes_labels(self):
+        self.assertEqual(
+            next(iter_dot(self.csr.nodes, (), 'a "b"')), 'digraph "a \\"b\\"" {'
+        )
+
+    def test_dot_clusters(self):
+        lines = list(iter_dot(self.csr.nodes, [(0, 1)], cluster=True))
+        modules = {node.get_path() for node in self.csr.nodes}
+        self.assertEqual(
+            len([line for line in lines if "subgraph cluster_" in line]), len(modules)
+        )
+        self.assertEqual(lines[-2], "  n0 -> n1;")
+
+    def test_npz_round_trip(self):
+        csr, metadata = load_npz(self.write("npz"))
+        graph = {node: node for node in csr.nodes}
+        self.assertEqual(set(graph), set(self.search.graph))
+        self.assertEqual(csr.dependent_ids, self.csr.dependent_ids)
+        self.assertEqual(csr.dependent_offsets, self.csr.dependent_offsets)
+        for node in self.search.graph:
+            self.assertEqual(
+                graph[node].get_edges(dependency=True),
+                node.get_edges(dependency=True),
+            )
+            self.assertEqual(graph[node].is_secondary(), node.is_secondary())
+        self.assertEqual(metadata["files"], self.search.files)
+        self.assertEqual(metadata["unsure_nodes"], self.search.unsure_nodes)
+
+
+if __name__ == "__main__":
+    unittest.main()
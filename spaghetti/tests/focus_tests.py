@@ -0,0 +1,73 @@
+import os
+import unittest
+from unittest import TestCase
+
+from spaghetti.focus import get_neighbourhood, match_nodes, parse_focus
+from spaghetti.func_node import FuncNode
+from spaghetti.search import Search
+
+DEMOS = os.path.join(os.path.dirname(__file__), "..", "..", "demos")
+
+
+class FocusTest(TestCase):
+    def setUp(self):
+        # a calls b, b calls c and c calls d
+        self.nodes = [
+            FuncNode(filename=os.path.join("pkg", "mod.py"), name=name)
+            for name in "abcd"
+        ]
+        for caller, callee in zip(self.nodes, self.nodes[1:]):
+            caller.add_edge(callee, dependency=True)
+            callee.add_edge(caller, dependency=False)
+        self.graph = {node: node for node in self.nodes}
+
+    def test_parse_focus(self):
+        self.assertEqual(parse_focus("pkg.mod:K.f"), ("pkg.mod", "K", "f"))
+        self.assertEqual(parse_focus("f"), ("", "", "f"))
+
+    def test_match_module(self):
+        for focus in ("b", "mod:b", "mod.py:b", "pkg.mod:b"):
+            self.assertEqual(match_nodes(self.nodes, focus), [self.nodes[1]])
+        self.assertEqual(match_nodes(self.nodes, "other:b"), [])
+
+    def test_depth(self):
+        a, b, c, d = self.nodes
+        self.assertEqual(get_neighbourhood(self.graph, [b], 1), {a, b, c})
+        self.assertEqual(get_neighbourhood(self.graph, [b], 0), {b})
+        self.assertEqual(get_neighbourhood(self.graph, [a], 5), {a, b, c, d})
+
+    def test_direction(self):
+        a, b, c, d = self.nodes
+        self.assertEqual(get_neighbourhood(self.graph, [c], 2, "in"), {a, b, c})
+        self.assertEqual(get_neighbourhood(self.graph, [c], 2, "out"), {c, d})
+
+
+class SearchFocusTest(TestCase):
+    def test_graphs_limited_to_focus(self):
+        search = Search([DEMOS])
+        nodes = search.set_focus("tester1.py:TestClass.__init__", 1, "in")
+        self.assertEqual(len(nodes), 1)
+        names = {repr(node) for node in search.get_csr_graph(secondary=True).nodes}
+        self.assertEqual(
+            names, {"tester1.py:TestClass.__init__", "tester1.py:.__main__"}
+        )
+        self.assertEqual(set(search.get_nx_graph()), search.focus_nodes)
+
+    def test_follows_nodes_in_the_graph(self):
+        search = Search([DEMOS])
+        # e calls g, which calls f
+        search.set_focus("ben_graph:e", 2, "out")
+        self.assertIn("ben_graph.py:.f", {repr(node) for node in search.focus_nodes})
+
+    def test_secondary_nodes_not_followed(self):
+        search = Search([DEMOS])
+        # function3 calls print, which every function in ben_graph calls too
+        search.set_focus("tester1:function3", 2, "both")
+        names = {repr(node) for node in search.focus_nodes}
+        self.assertIn("System:Builtins.print", names)
+        self.assertFalse(any(name.startswith("ben_graph.py") for name in names))
+
+
+if __name__ == "__main__":
+    # begin the unittest.main()
+    unittest.main()
@@ -26,6 +26,13 @@ class FuncNodeTest(TestCase):
     def test_node_equal(self):
         self.assertEqual(self.node, self.node_equal)
 
+    def test_names_that_join_alike_differ(self):
+        # A.dd and Add join to the same string
+        method = FuncNode(filename="f.py", class_name="A", name="dd")
+        function = FuncNode(filename="f.py", name="Add")
+        self.assertNotEqual(method, function)
+        self.assertEqual(len({method, function}), 2)
+
 
 if __name__ == "__main__":
     # begin the unittest.main()
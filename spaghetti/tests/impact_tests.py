@@ -0,0 +1,147 @@
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import TestCase, mock
+
+import spaghetti.command_line as cmd
+from spaghetti.impact import find_changed_nodes, get_changed_lines, parse_diff
+from spaghetti.search import Search
+
+SOURCE = """def a():
+    b()
+
+
+def b():
+    pass
+
+
+class K:
+    def m(self):
+        a()
+
+
+def c():
+    pass
+"""
+
+DIFF = """diff --git a/pkg/mod.py b/pkg/mod.py
+--- a/pkg/mod.py
++++ b/pkg/mod.py
+@@ -2 +2,2 @@ def a():
+-    b()
++    b()
++    b()
+@@ -9,0 +10 @@ class K:
+@@ -14 +14,0 @@ def c():
+-    pass
+diff --git a/old.py b/old.py
+--- a/old.py
++++ /dev/null
+@@ -1 +0,0 @@
+-x = 1
+"""
+
+
+class ParseDiffTest(TestCase):
+    def test_ranges(self):
+        root = os.path.join(os.sep, "repo")
+        self.assertEqual(
+            parse_diff(DIFF, root),
+            {os.path.join(root, "pkg", "mod.py"): [(2, 3), (10, 10), (14, 15)]},
+        )
+
+
+class FindChangedNodesTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "mod.py")
+        with open(self.filename, "w") as source:
+            source.write(SOURCE)
+        self.search = Search([self.filename])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def get_changed(self, *ranges):
+        nodes = find_changed_nodes(self.search, {self.filename: list(ranges)})
+        return sorted(node.get_class() + "." + node.get_name() for node in nodes)
+
+    def test_innermost_function(self):
+        self.assertEqual(self.get_changed((11, 11)), ["K.m"])
+        self.assertEqual(self.get_changed((9, 9)), ["K.__init__"])
+
+    def test_change_across_functions(self):
+        self.assertEqual(self.get_changed((2, 6)), [".a", ".b"])
+
+    def test_dependents(self):
+        self.search.focus_on(
+            find_changed_nodes(self.search, {self.filename: [(6, 6)]}), None, "in"
+        )
+        self.assertEqual(
+            sorted(node.get_name() for node in self.search.focus_nodes),
+            ["a", "b", "m"],
+        )
+
+
+@unittest.skipIf(shutil.which("git") is None, "git is not installed")
+class GetChangedLinesTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self.directory.name)
+        with open(os.path.join(self.root, "mod.py"), "w") as source:
+            source.write(SOURCE)
+        for arguments in (
+            ["init", "-q"],
+            ["add", "mod.py"],
+            ["-c", "user.name=test", "-c", "user.email=test@example.com"]
+            + ["commit", "-q", "-m", "initial"],
+        ):
+            subprocess.run(["git", "-C", self.root] + arguments, check=True)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_working_tree_changes(self):
+        with open(os.path.join(self.root, "mod.py"), "a") as source:
+            source.write("    return 1\n")
+        with open(os.path.join(self.root, "new.py"), "w") as source:
+            source.write("pass\n")
+        changed_lines = get_changed_lines("HEAD", self.root)
+        self.assertEqual(changed_lines[os.path.join(self.root, "mod.py")], [(16, 16)])
+        self.assertIn(os.path.join(self.root, "new.py"), changed_lines)
+
+    def test_measure_clean_tree(self):
+        for level in ("function", "module"):
+            out = io.StringIO()
+            argv = ["spaghetti", "impact", "-m", "--level", level, self.root]
+            with mock.patch.object(sys, "argv", argv), redirect_stdout(out):
+                cmd.main()
+            self.assertIn("Functions changed since HEAD: none", out.getvalue())
+            self.assertIn("There are no %ss to measure." % level, out.getvalue())
+        # Parsed files are cached in the repository by default
+        self.assertTrue(os.path.isdir(os.path.join(self.root, ".git", "spaghetti")))
+
+    def test_bad_revision(self):
+        with self.assertRaises(ValueError):
+            get_changed_lines("no-such-revision", self.root)
+        # Would be read as an option, writing the diff to a file
+        output = os.path.join(self.root, "out")
+        with self.assertRaises(ValueError):
+            get_changed_lines("--output=" + output, self.root)
+        self.assertFalse(os.path.exists(output))
+
+    def test_paths_in_different_repositories(self):
+        with tempfile.TemporaryDirectory() as other:
+            subprocess.run(["git", "-C", other, "init", "-q"], check=True)
+            with self.assertRaises(ValueError):
+                get_changed_lines("HEAD", self.root, other)
+
+
+if __name__ == "__main__":
+    # begin the unittest.main()
+    unittest.main()
@@ -0,0 +1,61 @@
+import importlib
+import os
+import tempfile
+import unittest
+from unittest import TestCase
+
+from spaghetti.imports import NOT_FOUND, ImportResolver
+
+
+class ImportResolverTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        root = self.directory.name
+        os.makedirs(os.path.join(root, "package", "sub"))
+        os.makedirs(os.path.join(root, "namespace"))
+        for filename in (
+            "package/__init__.py",
+            "package/sub/__init__.py",
+            "package/sub/leaf.py",
+            "module.py",
+        ):
+            with open(os.path.join(root, filename), "w") as source:
+                source.write("raise RuntimeError\n")
+        self.resolver = ImportResolver([root])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_modules_are_found_without_executing_them(self):
+        root = self.directory.name
+        self.assertEqual(
+            self.resolver.resolve("module"), (True, os.path.join(root, "module.py"))
+        )
+        self.assertEqual(
+            self.resolver.resolve("package.sub"),
+            (True, os.path.join(root, "package", "sub", "__init__.py")),
+        )
+        self.assertEqual(
+            self.resolver.resolve("package.sub.leaf"),
+            (True, os.path.join(root, "package", "sub", "leaf.py")),
+        )
+
+    def test_missing_modules(self):
+        self.assertEqual(self.resolver.resolve("missing"), NOT_FOUND)
+        self.assertEqual(self.resolver.resolve("module.child"), NOT_FOUND)
+        self.assertEqual(self.resolver.resolve(".module"), NOT_FOUND)
+
+    def test_modules_without_source(self):
+        self.assertEqual(self.resolver.resolve("namespace"), (True, None))
+        self.assertEqual(self.resolver.resolve("sys"), (True, None))
+
+    def test_matches_import_system(self):
+        resolver = ImportResolver()
+        for name in ("json", "json.decoder", "os"):
+            self.assertEqual(
+                resolver.resolve(name), (True, importlib.import_module(name).__file__)
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import unittest
+from unittest import TestCase
+
+from spaghetti.csr_graph import CSRGraph
+from spaghetti.func_node import FuncNode
+from spaghetti.levels import aggregate
+from spaghetti.search import Search
+
+DEMOS = os.path.join(os.path.dirname(__file__), "..", "..", "demos")
+
+
+class AggregateTest(TestCase):
+    def setUp(self):
+        a = os.path.join("pkg", "a.py")
+        b = os.path.join("pkg", "b.py")
+        c = os.path.join("other", "c.py")
+        self.f = FuncNode(filename=a, name="f")
+        self.g = FuncNode(filename=a, class_name="K", name="g")
+        self.h = FuncNode(filename=b, name="h")
+        self.i = FuncNode(filename=c, name="i")
+        # f calls g, h and i and g calls h
+        for caller, callee in (
+            (self.f, self.g),
+            (self.f, self.h),
+            (self.f, self.i),
+            (self.g, self.h),
+        ):
+            caller.add_edge(callee, dependency=True)
+            callee.add_edge(caller, dependency=False)
+        self.csr = CSRGraph([self.f, self.g, self.h, self.i])
+
+    def get_edges(self, graph):
+        return {
+            (repr(graph.nodes[node_id]), repr(graph.nodes[edge_id]), weight)
+            for node_id in range(graph.number_of_nodes())
+            for edge_id, weight in zip(
+                graph.get_edges(node_id, dependency=True),
+                graph.get_edge_weights(node_id, dependency=True),
+            )
+        }
+
+    def test_module_level(self):
+        graph = aggregate(self.csr, "module")
+        self.assertEqual([node.weight for node in graph.nodes], [1, 2, 1])
+        self.assertEqual(
+            self.get_edges(graph), {("a.py", "b.py", 2), ("a.py", "c.py", 1)}
+        )
+
+    def test_class_level_keeps_calls_between_classes(self):
+        graph = aggregate(self.csr, "class")
+        self.assertIn(("a.py", "a.py:K", 1), self.get_edges(graph))
+        self.assertEqual(graph.number_of_nodes(), 4)
+
+    def test_package_level_leaves_out_calls_within_a_package(self):
+        graph = aggregate(self.csr, "package")
+        self.assertEqual(self.get_edges(graph), {("pkg", "other", 1)})
+        self.assertEqual(graph.get_edge_weights(0, dependency=False).tolist(), [1])
+
+    def test_nodes_have_edges(self):
+        graph = aggregate(self.csr, "module")
+        a = graph.nodes[1]
+        self.assertEqual(
+            {repr(node) for node in a.get_edges(dependency=True)}, {"b.py", "c.py"}
+        )
+
+
+class SearchLevelTest(TestCase):
+    def test_weights_add_up(self):
+        functions = Search([DEMOS]).get_csr_graph(secondary=True)
+        modules = Search([DEMOS], level="module").get_csr_graph(secondary=True)
+        self.assertEqual(
+            sum(node.weight for node in modules.nodes), functions.number_of_nodes()
+        )
+        self.assertEqual(
+            len(modules.nodes), len({node.get_path() for node in functions.nodes})
+        )
+
+    def test_nx_graph_is_aggregated(self):
+        nxg = Search([DEMOS], level="package").get_nx_graph()
+        self.assertTrue(all(node.level == "package" for node in nxg))
+
+
+if __name__ == "__main__":
+    # begin the unittest.main()
+    unittest.main()
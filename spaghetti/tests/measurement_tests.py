@@ -3,6 +3,7 @@ from unittest import TestCase
 
 import networkx
 
+from spaghetti.csr_graph import CSRGraph
 from spaghetti.measurements import Measurements
 
 
@@ -28,6 +29,47 @@ class CommandLineTest(TestCase):
     def test_positive_connectivity(self):
         self.assertGreaterEqual(self.measure.node_connectivity, 0)
 
+    def test_isolated_severity(self):
+        self.assertEqual(self.measure.severity, 100)
+
+    def test_metrics_computed_lazily(self):
+        measure = Measurements(networkx.DiGraph([(0, 1)]))
+        self.assertEqual(measure.max_degree, 1)
+        self.assertNotIn("node_connectivity", measure.__dict__)
+        self.assertNotIn("severity", measure.__dict__)
+
+
+class SeverityTest(TestCase):
+    def setUp(self):
+        self.graph = networkx.gnp_random_graph(30, 0.05, seed=1, directed=True)
+
+    # Compares with the severity obtained from all pairs node connectivity
+    def test_matches_all_pairs_connectivity(self):
+        all_pairs_con = networkx.all_pairs_node_connectivity(self.graph.to_undirected())
+        connected = sum(
+            1
+            for node in all_pairs_con
+            for pair in all_pairs_con[node]
+            if all_pairs_con[node][pair] > 0
+        )
+        expected = 100 - 100 * connected / (30 * 29)
+        self.assertAlmostEqual(Measurements(self.graph).severity, expected)
+
+    def test_bound_used_for_large_connected_graph(self):
+        graph = networkx.cycle_graph(10, create_using=networkx.DiGraph)
+        measure = Measurements(graph, exact_connectivity_limit=5)
+        self.assertIsNone(measure.node_connectivity)
+        self.assertEqual(measure.node_connectivity_bound, 2)
+
+
+class EmptyGraphTest(TestCase):
+    def test_empty_graph(self):
+        measure = Measurements(CSRGraph([]))
+        self.assertEqual(measure.max_degree, 0)
+        self.assertEqual(measure.mean_degree, 0.0)
+        self.assertEqual(measure.severity, 0.0)
+        self.assertEqual(measure.node_num, 0)
+
 
 if __name__ == "__main__":
     # begin the unittest.main()
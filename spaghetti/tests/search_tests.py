@@ -0,0 +1,248 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import TestCase
+
+from spaghetti.export import write_graph
+from spaghetti.profiler import Profiler
+from spaghetti.search import Search
+
+DEMOS = os.path.join(os.path.dirname(__file__), "..", "..", "demos")
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.search = Search([os.path.join(DEMOS, "ex_sub_package", "simple_graph.py")])
+
+    def test_functions_indexed_by_name(self):
+        self.assertEqual([n.get_name() for n in self.search.symbols["a"]], ["a"])
+
+    def test_index_matches_graph(self):
+        indexed = set()
+        for nodes in self.search.symbols.values():
+            indexed.update(nodes)
+        self.assertEqual(indexed, set(self.search.graph))
+
+    def test_edge_resolved(self):
+        a = self.search.symbols["a"][0]
+        self.assertIn("b", [n.get_name() for n in a.get_edges(dependency=True)])
+
+    def test_graph_lines_match_graph_str(self):
+        lines = list(self.search.iter_graph_lines(indent="-40"))
+        self.assertEqual(
+            "".join(line + "\n" for line in lines),
+            self.search.get_graph_str(indent="-40"),
+        )
+        self.assertEqual(len(lines), 5)
+
+
+class CollidingNamesTest(TestCase):
+    def test_method_and_function_joining_alike(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "module.py")
+            with open(filename, "w") as source:
+                source.write(
+                    "class A:\n    def dd(self):\n        Add()\n\n\ndef Add():\n    pass\n"
+                )
+            search = Search([filename])
+        names = {(node.get_class(), node.get_name()) for node in search.graph}
+        self.assertIn(("", "Add"), names)
+        self.assertNotIn(("Unknown", "Add"), names)
+        method = search.symbols["dd"][0]
+        self.assertEqual(
+            [node.get_name() for node in method.get_edges(dependency=True)], ["Add"]
+        )
+        self.assertNotIn(method, method.get_edges(dependency=True))
+
+
+class HookTest(TestCase):
+    def test_phases_reported(self):
+        profiler = Profiler(slowest_files=1)
+        search = Search([DEMOS], hooks=[profiler])
+        search.get_nx_graph()
+        for phase in (
+            "crawl",
+            "symbol_extractor",
+            "node_creator",
+            "edge_detector",
+            "networkx",
+        ):
+            self.assertIn(phase, profiler.phase_seconds)
+        self.assertEqual(len(profiler.get_slowest_files(1)), 1)
+        self.assertIn(
+            "Files: %d" % len(search.files), profiler.iter_report_lines(search)
+        )
+
+
+class ParallelSearchTest(TestCase):
+    def test_same_graph_as_serial(self):
+        serial = Search([DEMOS])
+        parallel = Search([DEMOS], jobs=2)
+        self.assertEqual(list(serial.graph), list(parallel.graph))
+        self.assertEqual(serial.get_graph_str(), parallel.get_graph_str())
+
+
+class ReadAheadTest(TestCase):
+    def test_matches_reading_when_parsed(self):
+        self.assertEqual(
+            Search([DEMOS], read_threads=0).get_graph_str(),
+            Search([DEMOS], read_threads=2).get_graph_str(),
+        )
+
+
+class LoadSearchTest(TestCase):
+    def test_load_matches_search(self):
+        search = Search([DEMOS])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "graph.npz")
+            with open(path, "wb") as out:
+                write_graph(search, "npz", out)
+            loaded = Search.load(path, inverse=True)
+        search.inverse = True
+        self.assertEqual(loaded.get_graph_str(), search.get_graph_str())
+        self.assertEqual(loaded.uncrawled, search.uncrawled)
+        self.assertEqual(
+            set(loaded.get_nx_graph().edges), set(search.get_nx_graph().edges)
+        )
+
+
+class UpdateSearchTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        shutil.copytree(
+            os.path.join(DEMOS, "ex_sub_package"),
+            os.path.join(self.directory.name, "package"),
+        )
+        self.filename = os.path.join(self.directory.name, "package", "simple_graph.py")
+        self.search = Search([self.directory.name])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_update_matches_new_search(self):
+        with open(self.filename, "a") as source:
+            source.write("\n\ndef f():\n    e()\n    low_coupling_function()\n")
+        self.search.update([self.filename])
+        new_search = Search([self.directory.name])
+        self.assertEqual(
+            self.search.get_graph_str(),
+            new_search.get_graph_str(),
+        )
+
+    def test_update_removes_deleted_file(self):
+        os.remove(self.filename)
+        self.search.update([self.filename])
+        self.assertNotIn(self.filename, self.search.files)
+        self.assertNotIn("e", self.search.symbols)
+
+    def test_named_file_deleted_and_restored(self):
+        search = Search([self.filename])
+        with open(self.filename) as source:
+            code = source.read()
+        os.remove(self.filename)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(list(search.list_files()), [])
+        self.assertEqual(out.getvalue(), "")
+        search.update([self.filename])
+        with open(self.filename, "w") as source:
+            source.write(code)
+        search.update([self.filename])
+        self.assertIn(self.filename, search.files)
+        self.assertEqual(
+            search.get_graph_str(), Search([self.filename]).get_graph_str()
+        )
+
+
+class UpdatePlaceholderTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.a = os.path.join(self.directory.name, "a.py")
+        with open(self.a, "w") as source:
+            source.write("def x():\n    pass\n")
+        with open(os.path.join(self.directory.name, "b.py"), "w") as source:
+            source.write("def a():\n    foo()\n")
+        self.search = Search([self.directory.name])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_a(self, code):
+        with open(self.a, "w") as source:
+            source.write(code)
+        self.search.update([self.a])
+        new_search = Search([self.directory.name])
+        self.assertEqual(self.search.get_graph_str(), new_search.get_graph_str())
+        self.assertEqual(self.search.unsure_nodes, new_search.unsure_nodes)
+
+    def test_syntax_error_left_out(self):
+        with open(self.a, "w") as source:
+            source.write("def x(:\n")
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.search.update([self.a])
+        self.assertIn("Error: Could not parse %s" % self.a, out.getvalue())
+        self.assertNotIn(self.a, self.search.files)
+        self.write_a("def x():\n    pass\n\n\ndef foo():\n    pass\n")
+        self.assertIn(self.a, self.search.files)
+
+    def test_defined_after_unknown_call(self):
+        self.write_a("def x():\n    pass\n\n\ndef foo():\n    pass\n")
+        self.assertNotIn("Unknown:Unknown.foo", self.search.get_graph_str())
+        self.write_a("def x():\n    pass\n")
+        self.assertIn("Unknown:Unknown.foo", self.search.get_graph_str())
+        self.write_a("def x():\n    pass\n\n\ndef foo():\n    pass\n")
+        self.assertEqual(self.search.unsure_nodes, set())
+
+
+class ImportDepthTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        package = os.path.join(self.directory.name, "package")
+        os.makedirs(package)
+        sources = {
+            "__init__.py": "",
+            "main.py": "from .helpers import a\n\ndef main():\n    a()\n",
+            "helpers.py": "from . import deep, main\n\ndef a():\n    deep.d()\n",
+            "deep.py": "import package.helpers\n\ndef d():\n    pass\n",
+        }
+        for filename, source in sources.items():
+            with open(os.path.join(package, filename), "w") as source_file:
+                source_file.write(source)
+        self.filename = os.path.join(package, "main.py")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def search(self, import_depth):
+        parsed = []
+        search = Search(
+            [self.filename],
+            import_depth=import_depth,
+            hooks=[
+                lambda phase, seconds, file: (
+                    parsed.append(file) if phase == "symbol_extractor" else None
+                )
+            ],
+        )
+        modules = {os.path.basename(file) for file in search.file_nodes}
+        return modules, parsed
+
+    def test_import_depth(self):
+        self.assertNotIn("helpers.py", self.search(0)[0])
+        self.assertIn("helpers.py", self.search(1)[0])
+        self.assertNotIn("deep.py", self.search(1)[0])
+        self.assertIn("deep.py", self.search(2)[0])
+
+    def test_modules_parsed_once(self):
+        parsed = self.search(3)[1]
+        self.assertEqual(len(parsed), 3)
+        self.assertEqual(len(set(parsed)), 3)
+
+
+if __name__ == "__main__":
+    # begin the unittest.main()
+    unittest.main()